@@ -9,6 +9,9 @@ from typing import Any
 import orjson
 from loguru import logger
 
+# 擷取LLM回應中的 ```json 區塊
+_JSON_BLOCK_RE = re.compile(r"```json\s*([\s\S]*?)\s*```")
+
 
 class BaseAgent(ABC):
     """基礎Agent類"""
@@ -61,8 +64,15 @@ class BaseAgent(ABC):
 
             # 嘗試解析JSON響應
             try:
+                # 回應本身即為JSON時直接解析，省去正則表達式
+                if response.lstrip().startswith("{"):
+                    try:
+                        return orjson.loads(response)
+                    except orjson.JSONDecodeError:
+                        pass
+
                 # 使用正則表達式提取JSON部分
-                json_match = re.search(r"```json\s*([\s\S]*?)\s*```", response)
+                json_match = _JSON_BLOCK_RE.search(response)
                 json_str = json_match.group(1) if json_match else response
 
                 # 解析JSON
@@ -16,6 +16,9 @@ from src.cache.geo_cache import geo_cache
 from src.config import config
 from src.utils.geo_parser import geo_parser
 
+# 擷取LLM回應中的 ```json 區塊
+_JSON_FENCE_RE = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
+
 
 class LLMAgent(BaseAgent):
     """LLM Agent - 負責與語言模型進行交互"""
@@ -163,8 +166,7 @@ class LLMAgent(BaseAgent):
         response = await self.generate_response(messages, system_prompt)
 
         # 使用正則表達式提取JSON字符串
-        json_pattern = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
-        match = json_pattern.search(response)
+        match = _JSON_FENCE_RE.search(response)
 
         try:
             if match:
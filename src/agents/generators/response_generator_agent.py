@@ -2,6 +2,10 @@
 回應生成Agent，負責生成最終回應
 """
 
+import asyncio
+from functools import lru_cache
+from io import StringIO
+from operator import itemgetter
 from typing import Any
 
 from loguru import logger
@@ -10,6 +14,73 @@ from src.agents.base.base_agent import BaseAgent
 from src.cache.geo_cache import geo_cache
 from src.web.websocket import ws_manager
 
+# 評分文字，索引由 _rating_bucket 計算
+_RATING_TEXTS = ("普通", "滿意", "好", "非常好", "極佳")
+
+# 缺少縣市/區域時的預設值，僅供讀取
+_EMPTY_PLACE: dict[str, Any] = {}
+
+# 旅館欄位預設值，合併後以 itemgetter 一次取出所有欄位
+_HOTEL_DEFAULTS = {
+    "id": "",
+    "name": "未知",
+    "address": "未知",
+    "price": "未提供",
+    "rating": 0,
+    "rating_text": "",
+    "intro": "",
+    "check_in": "",
+    "check_out": "",
+    "phone": "",
+    "image_url": "",
+    "url": "",
+    "facilities": (),
+    "suitable_room_types": (),
+}
+_HOTEL_FIELDS = itemgetter(
+    "id", "name", "address", "price", "rating", "intro", "check_in", "check_out", "phone", "image_url", "url", "facilities"
+)
+_LLM_HOTEL_FIELDS = itemgetter(
+    "name", "address", "price", "rating_text", "check_in", "check_out", "suitable_room_types", "intro"
+)
+
+# LLM旅館文本模板，*_block 為已格式化的可選區塊或空字串
+_LLM_HOTEL_TMPL = (
+    "旅館{i}: {name}\n"
+    "地址: {address}\n"
+    "{location_block}"
+    "價格: {price}\n"
+    "{rating_block}{checkin_block}{facilities_block}{rooms_block}{intro_block}"
+    "\n"
+)
+
+# 方案欄位預設值，前端與LLM文本的預設值不同，分開定義
+_FRONTEND_PLAN_DEFAULTS = {
+    "plan_id": "",
+    "plan_name": "未知方案",
+    "hotel_name": "未知旅館",
+    "price": 0,
+    "original_price": None,
+    "description": "",
+    "image_url": "",
+    "url": "",
+    "start_date": None,
+    "end_date": None,
+}
+_FRONTEND_PLAN_FIELDS = itemgetter(*_FRONTEND_PLAN_DEFAULTS)
+_LLM_PLAN_DEFAULTS = {
+    "plan_name": "未知方案",
+    "hotel_name": "",
+    "price": "",
+    "discount_percent": "",
+    "start_date": None,
+    "end_date": None,
+    "description": "",
+    "terms": (),
+    "room_types": (),
+}
+_LLM_PLAN_FIELDS = itemgetter(*_LLM_PLAN_DEFAULTS)
+
 
 class ResponseGeneratorAgent(BaseAgent):
     """回應生成Agent - 負責處理和清洗旅館數據，並將其發送給前端"""
@@ -18,6 +89,8 @@ class ResponseGeneratorAgent(BaseAgent):
         """初始化回應生成Agent"""
         super().__init__("ResponseGeneratorAgent")
         self.logger = logger
+        # 無WebSocket連線時是否仍建立前端資料（下游僅需 hotel_details 進行推理）
+        self.always_build_frontend = False
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理生成回應的方法 - 清洗數據並準備回應"""
@@ -74,21 +147,36 @@ class ResponseGeneratorAgent(BaseAgent):
         query = state.get("query", "")
         self.logger.info(f"為查詢 '{query}' 整理數據，找到 {len(all_hotels)} 個旅館")
 
-        # 清洗和整理旅館資料 - 將旅館資料和方案資料合併為一個字串
-        hotels_text = self._format_hotels_for_llm(all_hotels)
-        plans_text = self._format_plans_for_llm(plan_search_results)
+        # 確保地理資料快取已在事件循環中初始化，執行緒內不觸碰 asyncio 物件
+        if not geo_cache._initialized:
+            await geo_cache.initialize()
+
+        # 為前端準備旅館和方案資料，沒有前端連線時略過
+        build_frontend = bool(session_id) or self.always_build_frontend
+
+        # 清洗和整理旅館資料 - 單次走訪同時產生前端資料與LLM文本
+        # 格式化屬於純CPU運算，移至執行緒避免阻塞事件循環
+        if plan_search_results:
+            (clean_hotels, hotels_text), plans_text = await asyncio.gather(
+                asyncio.to_thread(self._render_hotels, all_hotels, build_frontend),
+                asyncio.to_thread(self._format_plans_for_llm, plan_search_results),
+            )
+            clean_plans = self._prepare_frontend_plans(plan_search_results) if build_frontend else []
+        else:
+            # 沒有方案時不另開執行緒，也不走方案格式化
+            clean_hotels, hotels_text = await asyncio.to_thread(self._render_hotels, all_hotels, build_frontend)
+            plans_text = ""
+            clean_plans = []
 
         # 合併為一個完整的字串
         hotel_details = hotels_text + plans_text
 
-        # 為前端準備旅館和方案資料
-        clean_hotels = await self._prepare_frontend_hotels(all_hotels)
-        clean_plans = await self._prepare_frontend_plans(plan_search_results)
-
-        # 準備簡短回應
-        response_text = f"我找到了 {len(clean_hotels)} 個符合您要求的旅館。"
-        if clean_plans:
-            response_text += f" 其中 {len(clean_plans)} 個有特別方案。"
+        # 準備簡短回應（數量與前端資料的處理上限一致）
+        hotel_count = min(len(all_hotels), 10)
+        plan_count = min(len(plan_search_results), 5)
+        response_text = f"我找到了 {hotel_count} 個符合您要求的旅館。"
+        if plan_count:
+            response_text += f" 其中 {plan_count} 個有特別方案。"
 
         # 通過WebSocket發送清洗後的旅館資料
         if session_id:
@@ -108,163 +196,27 @@ class ResponseGeneratorAgent(BaseAgent):
             "hotel_details": hotel_details,
         }
 
-    async def _clean_hotel_data(self, hotels: list[dict[str, Any]]) -> list[str]:
-        """清洗和整理旅館資料，返回適合LLM評估的字串列表"""
-        self.logger.info(f"開始清洗 {len(hotels)} 間旅館資料")
-        clean_hotels_data = []
-        hotel_details_list = []
-
-        # 確保地理資料快取已初始化
-        if not geo_cache._initialized:
-            await geo_cache.initialize()
-
-        # 處理每個旅館
-        for i, hotel in enumerate(hotels[:10]):  # 限制處理數量
-            # 創建詳細的基本資料
-            clean_hotel = {
-                "id": hotel.get("id", ""),
-                "name": hotel.get("name", "未知"),
-                "address": hotel.get("address", "未知"),
-                "price": self._format_price(hotel.get("price")),
-                "rating": hotel.get("rating", 0),
-                "rating_text": self._convert_rating_to_text(hotel.get("rating", 0)),
-                "intro": hotel.get("intro", ""),
-                "intro_summary": self._summarize_text(hotel.get("intro", ""), 150),
-                "check_in": self._format_time(hotel.get("check_in", "")),
-                "check_out": self._format_time(hotel.get("check_out", "")),
-                "last_check_in": self._format_time(hotel.get("last_check_in", "")),
-                "phone": self._format_phone(hotel.get("phone", "")),
-                "image_url": hotel.get("image_url", ""),
-                "url": hotel.get("url", ""),
-                "location": {
-                    "latitude": hotel.get("latitude", 0),
-                    "longitude": hotel.get("longitude", 0),
-                },
-                "meals": self._format_meals(hotel.get("meals")),
-                "booking_notice": self._format_booking_notice(hotel.get("booking_notice", "")),
-            }
-
-            # 處理地理位置資訊
-            clean_hotel["location_info"] = self._extract_location_info(hotel)
-
-            # 處理設施資訊
-            facilities = hotel.get("facilities", [])
-            if facilities:
-                popular_facilities = [f.get("name", "") for f in facilities if f.get("is_popular", True)]
-                other_facilities = [f.get("name", "") for f in facilities if not f.get("is_popular", False)]
-
-                clean_hotel["facilities"] = {
-                    "popular": popular_facilities,
-                    "all": [f.get("name", "") for f in facilities],
-                    "others": other_facilities,
-                }
-
-                # 將設施分類
-                facility_categories = self._categorize_facilities(facilities)
-                clean_hotel["facility_categories"] = facility_categories
-
-            # 處理房型資訊
-            room_types = hotel.get("suitable_room_types", [])
-            if room_types:
-                clean_hotel["room_types"] = self._extract_room_types(room_types)
-
-            # 處理取消政策
-            cancel_policies = hotel.get("cancel_policies", [])
-            if cancel_policies:
-                clean_hotel["cancel_policies"] = self._format_cancel_policies(cancel_policies)
-
-            clean_hotels_data.append(clean_hotel)
-
-            # 為LLM創建文本格式的旅館詳情
-            hotel_detail = self._format_hotel_for_llm(i + 1, clean_hotel)
-            hotel_details_list.append(hotel_detail)
-
-        self.logger.info(f"完成清洗 {len(clean_hotels_data)} 間旅館資料")
-        return hotel_details_list  # 返回文本格式的旅館詳情列表
-
-    def _format_hotel_for_llm(self, index: int, hotel: dict[str, Any]) -> str:
-        """將旅館資料格式化為LLM易於理解的文本"""
-        name = hotel.get("name", "未知")
-        address = hotel.get("address", "未知")
-
-        # 獲取縣市區域資訊
-        location_info = hotel.get("location_info", {})
-        county = location_info.get("county", {})
-        county_name = county.get("name", "") if isinstance(county, dict) else county
-
-        district = location_info.get("district", {})
-        district_name = district.get("name", "") if isinstance(district, dict) else district
-
-        location_text = (
-            f"{county_name}{district_name}" if county_name and district_name else (county_name or district_name or "")
-        )
-
-        # 旅館基本資訊
-        result_lines = []
-        result_lines.append(f"【旅館{index}】{name}\n")
-        result_lines.append(f"地址: {address}\n")
-        if location_text:
-            result_lines.append(f"位置: {location_text}\n")
-
-        result_lines.append(f"價格: {hotel.get('price', '未提供')}\n")
-
-        if hotel.get("rating_text"):
-            result_lines.append(f"評價: {hotel.get('rating_text', '')}\n")
-
-        # 入住退房資訊
-        check_in = hotel.get("check_in", "")
-        check_out = hotel.get("check_out", "")
-        if check_in and check_out:
-            result_lines.append(f"入住: {check_in}, 退房: {check_out}\n")
-
-        # 設施資訊
-        if "facilities" in hotel and "popular" in hotel["facilities"] and hotel["facilities"]["popular"]:
-            popular = hotel["facilities"]["popular"][:5]  # 限制數量
-            result_lines.append(f"主要設施: {', '.join(popular)}\n")
-
-        # 房型資訊
-        if hotel.get("room_types"):
-            result_lines.append("客房類型:\n")
-            for j, room in enumerate(hotel["room_types"][:2]):  # 限制顯示的房型數量
-                result_lines.append(
-                    f"  - {room.get('name', '')}: {room.get('price', '')}, 可住{room.get('capacity', {}).get('total', 0)}人\n"
-                )
-
-        # 旅館簡介
-        if hotel.get("intro_summary"):
-            result_lines.append(f"簡介: {hotel.get('intro_summary', '')}\n")
-
-        # 取消政策
-        if hotel.get("cancel_policies"):
-            for policy in hotel["cancel_policies"][:1]:  # 只顯示最重要的取消政策
-                result_lines.append(f"取消政策: {policy.get('period', '')}{policy.get('description', '')}\n")
-
-        return "".join(result_lines)
-
     def _extract_location_info(self, hotel: dict[str, Any]) -> dict[str, Any]:
         """從旅館資料中提取地理位置信息"""
+        get = hotel.get
         location_info = {}
 
-        # 縣市資訊
-        if hotel.get("county"):
-            location_info["county"] = hotel["county"]
-        elif hotel.get("county_info"):
-            location_info["county"] = hotel["county_info"]
+        # 縣市資訊，統一為 {"name", "id"} 字典
+        if county := get("county") or get("county_info"):
+            location_info["county"] = _normalize_place(county)
 
-        # 區域資訊
-        if hotel.get("district"):
-            location_info["district"] = hotel["district"]
-        elif hotel.get("district_info"):
-            location_info["district"] = hotel["district_info"]
+        # 區域資訊，統一為 {"name", "id"} 字典
+        if district := get("district") or get("district_info"):
+            location_info["district"] = _normalize_place(district)
 
         # 國家、省份資訊
-        if hotel.get("country"):
-            location_info["country"] = hotel["country"]
-        if hotel.get("province"):
-            location_info["province"] = hotel["province"]
+        if country := get("country"):
+            location_info["country"] = country
+        if province := get("province"):
+            location_info["province"] = province
 
         # 提取地址中的郵遞區號和詳細地址
-        address = hotel.get("address", "")
+        address = get("address", "")
         if address:
             postal_code = self._extract_postal_code(address)
             if postal_code:
@@ -288,258 +240,25 @@ class ResponseGeneratorAgent(BaseAgent):
         match = re.match(r"^\d{3,5}", address)
         return match.group(0) if match else ""
 
-    def _extract_room_types(self, room_types: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """提取並格式化房型資訊"""
-        formatted_room_types = []
-
-        for room in room_types:
-            formatted_room = {
-                "id": room.get("id", ""),
-                "name": room.get("name", "未知房型"),
-                "price": self._format_price(room.get("price")),
-                "area": f"{room.get('avg_square_feet', 0)}坪" if room.get("avg_square_feet") else "未提供",
-                "bed_type": room.get("bed_type", "未提供"),
-                "capacity": {
-                    "adults": room.get("adults", 0),
-                    "children": room.get("children", 0),
-                    "total": room.get("adults", 0) + room.get("children", 0),
-                },
-                "intro": room.get("intro", ""),
-                "intro_summary": self._summarize_text(room.get("intro", ""), 100),
-            }
-
-            # 處理房型設施
-            if room.get("facilities"):
-                formatted_room["facilities"] = [f.get("name", "") for f in room["facilities"]]
-
-            # 處理價格方案
-            if room.get("prices"):
-                price_plans = []
-                for price_data in room["prices"]:
-                    plan = {
-                        "date": price_data.get("date", ""),
-                        "price": self._format_price(price_data.get("price")),
-                        "availability": price_data.get("rooms", 0),
-                    }
-                    if price_data.get("plan"):
-                        plan["plan_name"] = price_data["plan"].get("name", "基本方案")
-                        if "keywords" in price_data["plan"] and price_data["plan"]["keywords"]:
-                            plan["keywords"] = price_data["plan"]["keywords"]
-                    price_plans.append(plan)
-                formatted_room["price_plans"] = price_plans
-
-            formatted_room_types.append(formatted_room)
-
-        return formatted_room_types
-
-    def _format_cancel_policies(self, policies: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """格式化取消政策為更易讀的格式"""
-        formatted_policies = []
-
-        for policy in policies:
-            formatted_policy = {
-                "description": policy.get("description", ""),
-                "refund_percent": 100 - policy.get("percent", 0),
-            }
-
-            # 格式化時間段
-            start_days = policy.get("start_days")
-            end_days = policy.get("end_days")
-
-            if start_days is None and end_days is not None:
-                formatted_policy["period"] = f"入住前{end_days}天及更早"
-            elif start_days is not None and end_days is not None:
-                if start_days == end_days:
-                    formatted_policy["period"] = f"入住前{start_days}天"
-                else:
-                    formatted_policy["period"] = f"入住前{start_days}-{end_days}天"
-            elif start_days == 0 and end_days == 0:
-                formatted_policy["period"] = "入住當天或入住後"
-
-            formatted_policies.append(formatted_policy)
-
-        return formatted_policies
-
-    def _categorize_facilities(self, facilities: list[dict[str, Any]]) -> dict[str, list[str]]:
-        """將設施分類為不同類別"""
-        categories = {
-            "安全設施": [],
-            "服務設施": [],
-            "客房設施": [],
-            "交通設施": [],
-            "餐飲設施": [],
-            "清潔與健康": [],
-            "語言服務": [],
-            "支付選項": [],
-            "其他設施": [],
-        }
-
-        for facility in facilities:
-            name = facility.get("name", "")
-            if not name:
-                continue
-
-            if any(keyword in name for keyword in ["消毒", "清潔", "體溫", "口罩", "衛生"]):
-                categories["清潔與健康"].append(name)
-            elif any(keyword in name for keyword in ["急救", "滅火", "監視", "AED", "煙霧"]):
-                categories["安全設施"].append(name)
-            elif any(keyword in name for keyword in ["櫃檯", "接待", "入住", "行李", "退房", "收取包裹", "外送"]):
-                categories["服務設施"].append(name)
-            elif any(keyword in name for keyword in ["停車", "接送", "交通"]):
-                categories["交通設施"].append(name)
-            elif any(keyword in name for keyword in ["中文", "英文", "日文", "韓文"]):
-                categories["語言服務"].append(name)
-            elif any(keyword in name for keyword in ["刷卡", "支付", "電子支付"]):
-                categories["支付選項"].append(name)
-            elif any(keyword in name for keyword in ["早餐", "餐廳", "咖啡", "茶"]):
-                categories["餐飲設施"].append(name)
-            else:
-                categories["其他設施"].append(name)
-
-        # 刪除空類別
-        return {k: v for k, v in categories.items() if v}
-
-    def _format_meals(self, meals) -> str:
-        """格式化餐食資訊"""
-        if not meals:
-            return "不提供餐食"
-
-        if isinstance(meals, list):
-            try:
-                meal_mapping = {1: "早餐", 2: "中餐", 3: "晚餐"}
-                formatted_meals = []
-                for meal in meals:
-                    if isinstance(meal, int) and meal in meal_mapping:
-                        formatted_meals.append(meal_mapping[meal])
-                    else:
-                        # 確保所有非整數型別的餐食都轉為字串
-                        formatted_meals.append(str(meal))
-
-                # 確保所有列表項都是字串，再進行join操作
-                return ", ".join(formatted_meals)
-            except Exception as e:
-                self.logger.error(f"餐食資訊格式化錯誤: {e}, 原始資料: {meals}")
-                return "有提供餐食，但需要洽詢"
-
-        # 非列表類型，直接轉為字串
-        return str(meals)
-
-    def _format_booking_notice(self, notice: str) -> list[str]:
-        """將預訂須知分拆為條文列表"""
-        if not notice:
-            return []
-
-        # 根據段落或數字標記分拆
-        import re
-
-        # 先按行分拆
-        lines = notice.split("\n")
-
-        # 整理成條文，合併不是以數字或特殊符號開頭的行
-        formatted_lines = []
-        current_line = ""
-
-        for line in lines:
-            clean_line = line.strip()
-            if not clean_line:
-                continue
-
-            # 檢查是否是新條目開始
-            if re.match(r"^[0-9\.\-►•]+", clean_line) or "【" in clean_line[:3]:
-                if current_line:
-                    formatted_lines.append(current_line)
-                current_line = clean_line
-            else:
-                current_line += " " + clean_line
-
-        # 添加最後一行
-        if current_line:
-            formatted_lines.append(current_line)
-
-        return formatted_lines
-
     def _format_time(self, time_str: str) -> str:
         """格式化時間"""
-        if not time_str:
-            return ""
-
-        # 處理24小時制時間
-        if ":" in time_str:
-            try:
-                parts = time_str.split(":")
-                hour = int(parts[0])
-                minute = parts[1][:2]
-
-                # 轉為易讀格式
-                if hour < 12:
-                    return f"上午{hour}:{minute}"
-                if hour == 12:
-                    return f"中午{hour}:{minute}"
-                return f"下午{hour - 12}:{minute}"
-            except (ValueError, IndexError):
-                return time_str
-
-        return time_str
+        return _format_time(time_str)
 
     def _format_phone(self, phone: str) -> str:
         """格式化電話號碼"""
-        if not phone:
-            return ""
-
-        # 統一格式，去除空格
-        phone = phone.replace(" ", "")
-
-        # 格式化台灣電話號碼
-        if phone.startswith("0"):
-            if len(phone) == 10:  # 行動電話
-                return f"{phone[:4]}-{phone[4:7]}-{phone[7:]}"
-            if len(phone) == 9:  # 市話
-                return f"{phone[:2]}-{phone[2:5]}-{phone[5:]}"
-
-        return phone
+        return _format_phone(phone)
 
     def _format_price(self, price) -> str:
         """格式化價格"""
-        if not price:
-            return "未提供"
-
-        try:
-            price_int = int(float(price))
-            return f"NT$ {price_int:,}"
-        except (ValueError, TypeError):
-            return str(price)
+        return _format_price(price)
 
     def _convert_rating_to_text(self, rating: float) -> str:
         """將數字評分轉換為文字描述"""
-        if not rating:
-            return "尚無評價"
-
-        rating = float(rating)
-        if rating >= 4.5:
-            return "極佳"
-        if rating >= 4.0:
-            return "非常好"
-        if rating >= 3.5:
-            return "好"
-        if rating >= 3.0:
-            return "滿意"
-        return "普通"
+        return _convert_rating_to_text(rating)
 
     def _summarize_text(self, text: str, max_length: int = 100) -> str:
         """簡化長文本"""
-        if not text:
-            return ""
-
-        if len(text) <= max_length:
-            return text
-
-        # 嘗試在句號、問號或感嘆號處截斷
-        for i in range(max_length, max(max_length - 30, 0), -1):
-            if i < len(text) and text[i] in ["。", "!", "?", "！", "？", "."]:
-                return text[: i + 1]
-
-        # 如果找不到合適的截斷點，直接截斷並加上省略號
-        return text[:max_length] + "..."
+        return _summarize_text(text, max_length)
 
     async def _clean_plan_data(self, plans: list[dict[str, Any]]) -> list[str]:
         """清洗和整理方案資料，返回適合LLM評估的字串列表"""
@@ -590,27 +309,25 @@ class ResponseGeneratorAgent(BaseAgent):
         self.logger.info(f"完成清洗 {len(clean_plans_data)} 個方案資料")
         return plan_details_list  # 返回文本格式的方案詳情列表
 
+    def clear_format_caches(self) -> None:
+        """清除格式化輔助函數的快取，重新載入資料時使用"""
+        for formatter in _CACHED_FORMATTERS:
+            formatter.cache_clear()
+
     def _calculate_discount(self, current: float, original: float) -> str:
         """計算折扣百分比"""
         try:
             current = float(current)
             original = float(original)
             if original > 0:
-                discount = (original - current) / original * 100
-                return f"{discount:.0f}%"
+                return f"{_discount_pct(current, original):.0f}%"
         except (ValueError, TypeError):
             pass
         return None
 
     def _format_date_range(self, start_date: str, end_date: str) -> str:
         """格式化日期範圍"""
-        if not start_date and not end_date:
-            return "不限日期"
-        if start_date and not end_date:
-            return f"{start_date} 起"
-        if not start_date and end_date:
-            return f"至 {end_date}"
-        return f"{start_date} ~ {end_date}"
+        return _format_date_range(start_date, end_date)
 
     def _count_valid_days(self, start_date: str, end_date: str) -> int:
         """計算有效天數"""
@@ -645,34 +362,35 @@ class ResponseGeneratorAgent(BaseAgent):
         name = plan.get("name", "未知方案")
         hotel_name = plan.get("hotel_name", "")
 
-        result_lines = []
-        result_lines.append(f"【方案{index}】{name} ({hotel_name})\n")
-        result_lines.append(f"價格: {plan.get('price', '')}")
+        buf = StringIO()
+        write = buf.write
+        write(f"【方案{index}】{name} ({hotel_name})\n")
+        write(f"價格: {plan.get('price', '')}")
 
         if plan.get("discount_percent"):
-            result_lines.append(f" (折扣: {plan.get('discount_percent', '')})")
+            write(f" (折扣: {plan.get('discount_percent', '')})")
 
-        result_lines.append("\n")
+        write("\n")
 
         if plan.get("date_range"):
-            result_lines.append(f"有效期間: {plan.get('date_range', '')}\n")
+            write(f"有效期間: {plan.get('date_range', '')}\n")
 
         if plan.get("description_summary"):
-            result_lines.append(f"內容: {plan.get('description_summary', '')}\n")
+            write(f"內容: {plan.get('description_summary', '')}\n")
 
         # 添加方案條款
         if plan.get("terms") and isinstance(plan["terms"], list) and plan["terms"]:
-            result_lines.append("條款:\n")
+            write("條款:\n")
             for term in plan["terms"][:3]:  # 限制顯示的條款數量
-                result_lines.append(f"  - {term}\n")
+                write(f"  - {term}\n")
 
         # 添加適用房型
         if plan.get("room_types") and isinstance(plan["room_types"], list) and plan["room_types"]:
-            result_lines.append("適用房型:\n")
+            write("適用房型:\n")
             for room in plan["room_types"][:2]:  # 限制顯示的房型數量
-                result_lines.append(f"  - {room.get('name', '')}\n")
+                write(f"  - {room.get('name', '')}\n")
 
-        return "".join(result_lines)
+        return buf.getvalue()
 
     async def _send_hotels_to_frontend(
         self, session_id: str, hotels: list[dict[str, Any]], plans: list[dict[str, Any]]
@@ -780,215 +498,335 @@ class ResponseGeneratorAgent(BaseAgent):
             except Exception as e2:
                 self.logger.error(f"發送錯誤通知也失敗: {e2}")
 
-    async def _prepare_frontend_hotels(self, hotels: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """準備前端顯示用的旅館資料"""
-        self.logger.info(f"開始準備前端顯示用的旅館資料，共 {len(hotels)} 間")
-        clean_hotels = []
-
-        # 確保地理資料快取已初始化
-        if not geo_cache._initialized:
-            await geo_cache.initialize()
-
-        # 處理每個旅館
-        for hotel in hotels[:10]:  # 限制處理數量
-            # 創建詳細的基本資料
-            clean_hotel = {
-                "id": hotel.get("id", ""),
-                "name": hotel.get("name", "未知"),
-                "address": hotel.get("address", "未知"),
-                "price": self._format_price(hotel.get("price")),
-                "rating": hotel.get("rating", 0),
-                "rating_text": self._convert_rating_to_text(hotel.get("rating", 0)),
-                "intro_summary": self._summarize_text(hotel.get("intro", ""), 150),
-                "check_in": self._format_time(hotel.get("check_in", "")),
-                "check_out": self._format_time(hotel.get("check_out", "")),
-                "phone": self._format_phone(hotel.get("phone", "")),
-                "image_url": hotel.get("image_url", ""),
-                "url": hotel.get("url", ""),
-            }
-
-            # 處理地理位置資訊
-            location_info = self._extract_location_info(hotel)
-            county = location_info.get("county", "")
-            district = location_info.get("district", "")
-
-            # 處理不同數據結構
-            county_name = county.get("name", "") if isinstance(county, dict) else str(county)
-            district_name = district.get("name", "") if isinstance(district, dict) else str(district)
-
-            clean_hotel["location"] = {"county": county_name, "district": district_name}
-
-            # 處理設施資訊
-            facilities = hotel.get("facilities", [])
-            if facilities:
-                popular_facilities = [f.get("name", "") for f in facilities if f.get("is_popular", True)]
-                clean_hotel["facilities"] = popular_facilities[:5]  # 只取前5個主要設施
-
-            clean_hotels.append(clean_hotel)
-
-        self.logger.info(f"完成準備前端顯示用的旅館資料，共 {len(clean_hotels)} 間")
-        return clean_hotels
-
-    async def _prepare_frontend_plans(self, plans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def _prepare_frontend_plans(self, plans: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """準備前端顯示用的方案資料"""
         if not plans:
             return []
 
-        self.logger.info(f"開始準備前端顯示用的方案資料，共 {len(plans)} 個")
+        self.logger.opt(lazy=True).info("開始準備前端顯示用的方案資料，共 {} 個", lambda: len(plans))
         clean_plans = []
 
         for plan in plans[:5]:  # 限制回傳數量
+            (
+                plan_id,
+                plan_name,
+                hotel_name,
+                price,
+                original_price,
+                description,
+                image_url,
+                url,
+                start_date,
+                end_date,
+            ) = _FRONTEND_PLAN_FIELDS({**_FRONTEND_PLAN_DEFAULTS, **plan})
             clean_plan = {
-                "id": plan.get("plan_id", ""),
-                "name": plan.get("plan_name", "未知方案"),
-                "hotel_name": plan.get("hotel_name", "未知旅館"),
-                "price": self._format_price(plan.get("price", 0)),
-                "discount_percent": self._calculate_discount(plan.get("price", 0), plan.get("original_price")),
-                "description_summary": self._summarize_text(plan.get("description", ""), 120),
-                "image_url": plan.get("image_url", ""),
-                "url": plan.get("url", ""),
-                "date_range": self._format_date_range(plan.get("start_date"), plan.get("end_date")),
+                "id": plan_id,
+                "name": plan_name,
+                "hotel_name": hotel_name,
+                "price": self._format_price(price),
+                "discount_percent": self._calculate_discount(price, original_price),
+                "description_summary": self._summarize_text(description, 120),
+                "image_url": image_url,
+                "url": url,
+                "date_range": self._format_date_range(start_date, end_date),
             }
 
             clean_plans.append(clean_plan)
 
-        self.logger.info(f"完成準備前端顯示用的方案資料，共 {len(clean_plans)} 個")
+        self.logger.opt(lazy=True).info("完成準備前端顯示用的方案資料，共 {} 個", lambda: len(clean_plans))
         return clean_plans
 
-    def _format_hotels_for_llm(self, hotels: list[dict[str, Any]]) -> str:
-        """將旅館資料格式化為LLM易於理解的文本"""
+    def _render_hotels(
+        self, hotels: list[dict[str, Any]], build_frontend: bool = True
+    ) -> tuple[list[dict[str, Any]], str]:
+        """單次走訪旅館列表，同時產生前端顯示用的旅館資料與LLM易於理解的文本"""
         if not hotels:
-            return "無旅館資料"
+            return [], "無旅館資料"
 
-        result_lines = []
-        result_lines.append("旅館資料\n\n")
+        self.logger.opt(lazy=True).info("開始整理旅館資料，共 {} 間", lambda: len(hotels))
+        clean_hotels = []
+        blocks = []
 
         # 限制處理的旅館數量，避免超出LLM上下文長度
-        max_hotels = min(10, len(hotels))
-
-        for i, hotel in enumerate(hotels[:max_hotels]):
-            name = hotel.get("name", "未知")
-            address = hotel.get("address", "未知")
-            price = hotel.get("price", "未提供")
-            rating = hotel.get("rating_text", "")
-
-            # 獲取縣市區域資訊
-            location_info = hotel.get("location_info", {})
-            county = location_info.get("county", {})
-            county_name = county.get("name", "") if isinstance(county, dict) else county
-
-            district = location_info.get("district", {})
-            district_name = district.get("name", "") if isinstance(district, dict) else district
-
-            location_text = (
-                f"{county_name}{district_name}"
-                if county_name and district_name
-                else (county_name or district_name or "")
-            )
+        for index, hotel in enumerate(hotels[:10], 1):
+            # 補齊預設值後一次取出所有欄位
+            merged = {**_HOTEL_DEFAULTS, **hotel}
+            (
+                hotel_id,
+                name,
+                address,
+                price,
+                rating,
+                intro,
+                check_in,
+                check_out,
+                phone,
+                image_url,
+                url,
+                facilities,
+            ) = _HOTEL_FIELDS(merged)
+
+            # 處理地理位置資訊，前端與LLM共用
+            location_info = self._extract_location_info(hotel)
+            county_name = location_info.get("county", _EMPTY_PLACE).get("name", "")
+            district_name = location_info.get("district", _EMPTY_PLACE).get("name", "")
+
+            # 處理設施資訊，每間旅館只計算一次，前端與LLM共用
+            popular_facilities = _popular_facility_names(facilities)
+
+            if build_frontend:
+                clean_hotel = {
+                    "id": hotel_id,
+                    "name": name,
+                    "address": address,
+                    "price": self._format_price(price),
+                    "rating": rating,
+                    "rating_text": self._convert_rating_to_text(rating),
+                    "intro_summary": self._summarize_text(intro, 150),
+                    "check_in": self._format_time(check_in),
+                    "check_out": self._format_time(check_out),
+                    "phone": self._format_phone(phone),
+                    "image_url": image_url,
+                    "url": url,
+                    "location": {"county": county_name, "district": district_name},
+                }
+                if facilities:
+                    clean_hotel["facilities"] = popular_facilities[:5]  # 只取前5個主要設施
+                clean_hotels.append(clean_hotel)
+
+            location_text = _location_text(county_name, district_name)
+            blocks.append(_format_llm_hotel_block(index, merged, location_text, popular_facilities))
 
-            # 旅館基本資訊 - 使用更簡潔的格式
-            result_lines.append(f"旅館{i + 1}: {name}\n")
-            result_lines.append(f"地址: {address}\n")
-            if location_text:
-                result_lines.append(f"位置: {location_text}\n")
-            result_lines.append(f"價格: {price}\n")
-            if rating:
-                result_lines.append(f"評價: {rating}\n")
-
-            # 入住退房資訊
-            check_in = hotel.get("check_in", "")
-            check_out = hotel.get("check_out", "")
-            if check_in and check_out:
-                result_lines.append(f"入住/退房: {check_in} / {check_out}\n")
-
-            # 設施資訊 - 使用簡潔的清單格式
-            facilities = hotel.get("facilities", [])
-            if facilities:
-                popular_facilities = [f.get("name", "") for f in facilities if f.get("is_popular", True)]
-                if popular_facilities:
-                    result_lines.append("主要設施: ")
-                    result_lines.append(", ".join(popular_facilities[:5]))  # 限制顯示的設施數量
-                    result_lines.append("\n")
-
-            # 房型資訊 - 使用簡潔的清單格式
-            room_types = hotel.get("suitable_room_types", [])
-            if room_types:
-                result_lines.append("客房類型:\n")
-                for j, room in enumerate(room_types[:3]):  # 限制顯示的房型數量
-                    room_name = room.get("name", "")
-                    room_price = room.get("price", "")
-                    room_capacity = room.get("adults", 0)
-                    result_lines.append(f"  - {room_name}: {room_price}, 可住{room_capacity}人\n")
-
-            # 旅館簡介
-            intro = hotel.get("intro", "")
-            if intro:
-                # 取簡介的前150個字符並加上省略號
-                short_intro = intro[:150] + "..." if len(intro) > 150 else intro
-                result_lines.append(f"簡介: {short_intro}\n")
-
-            # 添加分隔符
-            result_lines.append("\n")
-
-        return "".join(result_lines)
+        self.logger.opt(lazy=True).info("完成整理旅館資料，共 {} 間", lambda: len(blocks))
+        return clean_hotels, "旅館資料\n\n" + "".join(blocks)
 
     def _format_plans_for_llm(self, plans: list[dict[str, Any]]) -> str:
         """將方案資料格式化為LLM易於理解的文本"""
         if not plans:
             return ""
 
-        result_lines = []
-        result_lines.append("特價方案\n\n")
-
         # 限制處理的方案數量
-        max_plans = min(5, len(plans))
-
-        for i, plan in enumerate(plans[:max_plans]):
-            name = plan.get("plan_name", "未知方案")
-            hotel_name = plan.get("hotel_name", "")
-            price = plan.get("price", "")
-            discount = plan.get("discount_percent", "")
-
-            # 方案基本資訊 - 使用更簡潔的格式
-            result_lines.append(f"方案{i + 1}: {name}\n")
-            result_lines.append(f"旅館: {hotel_name}\n")
-            result_lines.append(f"價格: {price}")
-
-            if discount:
-                result_lines.append(f" (折扣: {discount})")
-
-            result_lines.append("\n")
-
-            # 日期範圍
-            date_range = self._format_date_range(plan.get("start_date"), plan.get("end_date"))
-            if date_range and date_range != "不限日期":
-                result_lines.append(f"有效期間: {date_range}\n")
-
-            # 方案描述
-            description = plan.get("description", "")
-            if description:
-                # 取描述的前150個字符並加上省略號
-                short_desc = description[:150] + "..." if len(description) > 150 else description
-                result_lines.append(f"內容: {short_desc}\n")
-
-            # 方案條款 - 使用簡潔的清單格式
-            terms = plan.get("terms", [])
-            if terms and isinstance(terms, list) and terms:
-                result_lines.append("條款:\n")
-                for term in terms[:3]:  # 限制顯示的條款數量
-                    result_lines.append(f"  - {term}\n")
-
-            # 適用房型 - 使用簡潔的清單格式
-            room_types = plan.get("room_types", [])
-            if room_types and isinstance(room_types, list) and room_types:
-                result_lines.append("適用房型:\n")
-                for room in room_types[:2]:  # 限制顯示的房型數量
-                    result_lines.append(f"  - {room.get('name', '')}\n")
-
-            # 添加分隔符
-            result_lines.append("\n")
-
-        return "".join(result_lines)
+        blocks = map(_format_llm_plan_block, range(1, 6), plans)
+        return "特價方案\n\n" + "".join(blocks)
+
+
+@lru_cache(maxsize=2048)
+def _format_time(time_str: str) -> str:
+    """格式化時間"""
+    if not time_str:
+        return ""
+
+    # 處理24小時制時間
+    if ":" in time_str:
+        try:
+            parts = time_str.split(":")
+            hour = int(parts[0])
+            minute = parts[1][:2]
+
+            # 轉為易讀格式
+            if hour < 12:
+                return f"上午{hour}:{minute}"
+            if hour == 12:
+                return f"中午{hour}:{minute}"
+            return f"下午{hour - 12}:{minute}"
+        except (ValueError, IndexError):
+            return time_str
+
+    return time_str
+
+
+@lru_cache(maxsize=2048)
+def _format_phone(phone: str) -> str:
+    """格式化電話號碼"""
+    if not phone:
+        return ""
+
+    # 統一格式，去除空格
+    phone = phone.replace(" ", "")
+
+    # 格式化台灣電話號碼
+    if phone.startswith("0"):
+        if len(phone) == 10:  # 行動電話
+            return f"{phone[:4]}-{phone[4:7]}-{phone[7:]}"
+        if len(phone) == 9:  # 市話
+            return f"{phone[:2]}-{phone[2:5]}-{phone[5:]}"
+
+    return phone
+
+
+@lru_cache(maxsize=2048)
+def _format_price(price) -> str:
+    """格式化價格"""
+    if not price:
+        return "未提供"
+
+    try:
+        price_int = int(float(price))
+        return f"NT$ {price_int:,}"
+    except (ValueError, TypeError):
+        return str(price)
+
+
+@lru_cache(maxsize=2048)
+def _convert_rating_to_text(rating: float) -> str:
+    """將數字評分轉換為文字描述"""
+    if not rating:
+        return "尚無評價"
+    return _RATING_TEXTS[_rating_bucket(float(rating))]
+
+
+@lru_cache(maxsize=2048)
+def _summarize_text(text: str, max_length: int = 100) -> str:
+    """簡化長文本"""
+    if not text:
+        return ""
+
+    if len(text) <= max_length:
+        return text
+
+    # 嘗試在句號、問號或感嘆號處截斷
+    for i in range(max_length, max(max_length - 30, 0), -1):
+        if i < len(text) and text[i] in ["。", "!", "?", "！", "？", "."]:
+            return text[: i + 1]
+
+    # 如果找不到合適的截斷點，直接截斷並加上省略號
+    return text[:max_length] + "..."
+
+
+@lru_cache(maxsize=1024)
+def _truncate(text: str, max_length: int, suffix: str = "...") -> str:
+    """超過長度時直接截斷並加上省略號，LLM文本的簡介與方案內容共用"""
+    return text if len(text) <= max_length else text[:max_length] + suffix
+
+
+def _popular_facility_names(facilities: list[dict[str, Any]] | None) -> list[str]:
+    """取得主要設施名稱，不修改傳入的旅館資料"""
+    return [f.get("name", "") for f in facilities or () if f.get("is_popular", True)]
+
+
+def _location_text(county_name: str, district_name: str) -> str:
+    """組合縣市與區域名稱為位置文字"""
+    return f"{county_name}{district_name}" if county_name and district_name else (county_name or district_name or "")
+
+
+def _normalize_place(place: Any) -> dict[str, Any]:
+    """將縣市/區域統一為字典，字串名稱轉為 {"name": 名稱, "id": None}"""
+    return place if isinstance(place, dict) else {"name": str(place), "id": None}
+
+
+def _rating_bucket(rating: float) -> int:
+    """將評分量化為 _RATING_TEXTS 的索引，門檻為 3.0/3.5/4.0/4.5，以半分為單位直接換算"""
+    return min(max(int(rating * 2) - 5, 0), 4)
+
+
+def _discount_pct(price: float, original: float) -> float:
+    """計算相對原價的折扣百分比，original 須大於 0"""
+    return (original - price) / original * 100
+
+
+@lru_cache(maxsize=2048)
+def _format_date_range(start_date: str, end_date: str) -> str:
+    """格式化日期範圍"""
+    if not start_date and not end_date:
+        return "不限日期"
+    if start_date and not end_date:
+        return f"{start_date} 起"
+    if not start_date and end_date:
+        return f"至 {end_date}"
+    return f"{start_date} ~ {end_date}"
+
+
+# 以 lru_cache 快取結果的純函數格式化工具
+_CACHED_FORMATTERS = (
+    _format_time,
+    _format_phone,
+    _format_price,
+    _convert_rating_to_text,
+    _summarize_text,
+    _truncate,
+    _format_date_range,
+)
+
+
+def _format_llm_hotel_block(
+    index: int, hotel: dict[str, Any], location_text: str, popular_facilities: list[str]
+) -> str:
+    """將單一旅館格式化為LLM文本區塊，hotel 須已補齊 _HOTEL_DEFAULTS，位置與主要設施由呼叫端傳入"""
+    name, address, price, rating, check_in, check_out, room_types, intro = _LLM_HOTEL_FIELDS(hotel)
+
+    # 可選區塊先組成字串，缺少時為空字串，最後以模板一次輸出
+    ctx = {
+        "i": index,
+        "name": name,
+        "address": address,
+        "price": price,
+        "location_block": f"位置: {location_text}\n" if location_text else "",
+        "rating_block": f"評價: {rating}\n" if rating else "",
+        "checkin_block": f"入住/退房: {check_in} / {check_out}\n" if check_in and check_out else "",
+        # 限制顯示的設施數量
+        "facilities_block": f"主要設施: {', '.join(popular_facilities[:5])}\n" if popular_facilities else "",
+        # 限制顯示的房型數量
+        "rooms_block": "客房類型:\n"
+        + "".join(
+            f"  - {room.get('name', '')}: {room.get('price', '')}, 可住{room.get('adults', 0)}人\n"
+            for room in room_types[:3]
+        )
+        if room_types
+        else "",
+        # 旅館簡介，取前150個字符並加上省略號
+        "intro_block": f"簡介: {_truncate(intro, 150)}\n" if intro else "",
+    }
+    return _LLM_HOTEL_TMPL.format_map(ctx)
+
+
+def _format_llm_plan_block(index: int, plan: dict[str, Any]) -> str:
+    """將單一方案格式化為LLM文本區塊"""
+    (
+        name,
+        hotel_name,
+        price,
+        discount,
+        start_date,
+        end_date,
+        description,
+        terms,
+        room_types,
+    ) = _LLM_PLAN_FIELDS({**_LLM_PLAN_DEFAULTS, **plan})
+    buf = StringIO()
+    write = buf.write
+
+    # 方案基本資訊 - 使用更簡潔的格式
+    write(f"方案{index}: {name}\n")
+    write(f"旅館: {hotel_name}\n")
+    write(f"價格: {price}")
+    if discount:
+        write(f" (折扣: {discount})")
+    write("\n")
+
+    # 日期範圍
+    date_range = _format_date_range(start_date, end_date)
+    if date_range and date_range != "不限日期":
+        write(f"有效期間: {date_range}\n")
+
+    # 方案描述，取前150個字符並加上省略號
+    if description:
+        write(f"內容: {_truncate(description, 150)}\n")
+
+    # 方案條款 - 使用簡潔的清單格式
+    if terms and isinstance(terms, list):
+        write("條款:\n")
+        for term in terms[:3]:  # 限制顯示的條款數量
+            write(f"  - {term}\n")
+
+    # 適用房型 - 使用簡潔的清單格式
+    if room_types and isinstance(room_types, list):
+        write("適用房型:\n")
+        for room in room_types[:2]:  # 限制顯示的房型數量
+            write(f"  - {room.get('name', '')}\n")
+
+    # 添加分隔符
+    write("\n")
+    return buf.getvalue()
 
 
 # 創建回應生成Agent實例
@@ -6,10 +6,71 @@ import re
 from typing import Any
 
 from loguru import logger
-from spacy.matcher import Matcher
 
 from src.agents.base.base_agent import BaseAgent
-from src.utils.nlp_utils import get_shared_spacy_model
+from src.utils.nlp_utils import analyze, get_shared_spacy_model
+
+# 實體內的數字模式與數字偵測，模組載入時編譯一次
+_ENT_AMOUNT_RE = re.compile(r"\d+(?:,\d+)?")
+_DIGIT_RE = re.compile(r"\d")
+
+# 價格模式：範圍、最低、最高與大約，模組載入時編譯一次
+_CURRENCY_UNITS = r"(?:元|塊|NT\$|台幣|TWD|NTD|新台幣)?"
+_TIME_UNITS = r"(?:/晚|每晚|一晚)?"
+_NUM = r"(\d+(?:,\d+)?(?:\.\d+)?)"
+_PRICE_SOURCES = {
+    "range": rf"{_NUM}\s*(?:-|~|到)\s*{_NUM}\s*{_CURRENCY_UNITS}{_TIME_UNITS}",
+    "min": rf"(?:最低|至少|起碼)\s*{_NUM}\s*{_CURRENCY_UNITS}{_TIME_UNITS}",
+    "max": rf"(?:最高|最多|不超過)\s*{_NUM}\s*{_CURRENCY_UNITS}{_TIME_UNITS}",
+    "approx": rf"{_NUM}\s*{_CURRENCY_UNITS}{_TIME_UNITS}\s*(?:左右|上下|附近|大約)",
+}
+_PRICE_PATTERNS = {name: re.compile(source) for name, source in _PRICE_SOURCES.items()}
+# 各價格模式合併為一次掃描；以零寬前瞻包住，各位置都會嘗試，重疊的匹配不會被吃掉
+_PRICE_RE = re.compile("(?=" + "|".join(f"(?P<{name}>{source})" for name, source in _PRICE_SOURCES.items()) + ")")
+
+# 後備解析規則（原spaCy Matcher規則）：範圍、最低/最高與單一金額，以零寬前瞻逐位置比對
+# 數字前不可緊接數字或千分位符號，對應分詞後從數字開頭比對的行為
+_FALLBACK_NUM = rf"(?<![\d.,]){_NUM}"
+_FALLBACK_PRICE_RE = re.compile(
+    rf"(?=(?P<range>{_FALLBACK_NUM}\s*(?:-|~|到)\s*{_NUM})"
+    rf"|(?P<min>(?:最低|至少|起碼)\s*{_NUM})"
+    rf"|(?P<max>(?:最高|最多|不超過)\s*{_NUM})"
+    rf"|(?P<single>{_FALLBACK_NUM}))"
+)
+# 金額單位與上限關鍵字，各以一次掃描取代逐一子字串比對
+_MONEY_UNIT_RE = re.compile(r"元|塊|NT\$|台幣")
+_MAX_KW_RE = re.compile("最多|不超過|最高")
+# 數字後緊接年/月/日/號，或以-、/連接下一段數字時，視為日期的一部分而非金額
+_DATE_SUFFIX_RE = re.compile(r"[年月日號]|[-/]\d")
+
+# 範圍/最低/最高/大約模式各自必含的字元（-~到、最至起不、左上附大），查詢中皆無時不必掃描
+_PRICE_HINT_CHARS = frozenset("-~到最至起不左上附大")
+
+
+def _scan_number(query: str, start: int) -> str:
+    """從start處的數字向後掃描，涵蓋千分位逗號與一個小數點"""
+    end = start + 1
+    n = len(query)
+    seen_dot = False
+    while end < n:
+        c = query[end]
+        if c.isdecimal():
+            end += 1
+        elif (c == "," or (c == "." and not seen_dot)) and end + 1 < n and query[end + 1].isdecimal():
+            seen_dot = seen_dot or c == "."
+            end += 2
+        else:
+            break
+    return query[start:end]
+
+
+def _unit_multiplier(query: str) -> int:
+    """依查詢中的金額單位（萬/千/k）決定倍率"""
+    if "萬" in query:
+        return 10000
+    if "千" in query or "k" in query or "K" in query:
+        return 1000
+    return 1
 
 
 class BudgetParserAgent(BaseAgent):
@@ -19,53 +80,24 @@ class BudgetParserAgent(BaseAgent):
 
     def __init__(self):
         super().__init__("BudgetParserAgent")
-        self._init_regex_patterns()
-        self.spacy_available = False
-        try:
-            self.nlp = get_shared_spacy_model("zh_core_web_md")
-            self.spacy_available = True
-            logger.info("成功載入spaCy中文模型")
-            self._init_spacy_matcher()
-        except Exception as e:
-            logger.warning(f"無法載入spaCy模型: {e!s}，將使用正則表達式")
+        # spaCy模型延遲到需要金額實體分析時才載入，None 表示尚未嘗試
+        self.spacy_available: bool | None = None
         self.err_result = {
             "error": "未提取到預算信息",
             "err_msg": " 不好意思，無法從您的訊息中得知預算範圍，方便提供一下嗎？",
         }
 
-    def _init_regex_patterns(self):
-        """初始化正則表達式模式"""
-        self.currency_units = r"(?:元|塊|NT\$|台幣|TWD|NTD|新台幣)?"
-        self.time_units = r"(?:/晚|每晚|一晚)?"
-        num_pattern = r"(\d+(?:,\d+)?(?:\.\d+)?)"
-        self.patterns = {
-            "range": re.compile(
-                rf"{num_pattern}\s*(?:-|~|到)\s*{num_pattern}\s*{self.currency_units}{self.time_units}"
-            ),
-            "limit": re.compile(
-                rf"(?:最低|至少|起碼|最高|最多|不超過)\s*{num_pattern}\s*{self.currency_units}{self.time_units}"
-            ),
-            "approx": re.compile(rf"{num_pattern}\s*{self.currency_units}{self.time_units}\s*(?:左右|上下|附近|大約)"),
-            "any": re.compile(r"(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:萬|k|K|千|元|塊|NTD|TWD|台幣|新台幣)?"),
-        }
-
-    def _init_spacy_matcher(self):
-        """初始化spaCy匹配器"""
-        if not self.spacy_available:
-            return
-        self.matcher = Matcher(self.nlp.vocab)
-        self.matcher.add(
-            "PRICE",
-            [
-                [{"LIKE_NUM": True}, {"TEXT": {"IN": ["-", "~", "到"]}}, {"LIKE_NUM": True}],
-                [{"TEXT": {"IN": ["最低", "至少", "起碼", "最高", "最多", "不超過"]}}, {"LIKE_NUM": True}],
-                [
-                    {"LIKE_NUM": True},
-                    {"OP": "?", "TEXT": {"IN": ["元", "塊", "NT$", "台幣"]}},
-                    {"OP": "?", "TEXT": {"IN": ["左右", "上下", "附近"]}},
-                ],
-            ],
-        )
+    def _ensure_spacy(self) -> bool:
+        """首次需要時載入spaCy模型，返回是否可用"""
+        if self.spacy_available is None:
+            try:
+                get_shared_spacy_model("zh_core_web_md")
+                self.spacy_available = True
+                logger.info("成功載入spaCy中文模型")
+            except Exception as e:
+                self.spacy_available = False
+                logger.warning(f"無法載入spaCy模型: {e!s}，將使用正則表達式")
+        return self.spacy_available
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理預算解析請求"""
@@ -73,10 +105,18 @@ class BudgetParserAgent(BaseAgent):
         query = state.get("query", "")
         if "無預算" in query:
             return {"lowest_price": None, "highest_price": None}
+        # 正則、後備規則與spaCy解析都需要阿拉伯數字，沒有數字時直接視為未提取到預算
+        if not _DIGIT_RE.search(query):
+            logger.info(f"[{self.name}] 未提取到預算: {query}")
+            return self.err_result
         try:
-            budget = self._parse_with_regex(query)
-            if not budget.get("lowest_price") and not budget.get("highest_price") and self.spacy_available:
-                budget = self._parse_with_spacy(query)
+            # 金額單位倍率整個查詢只判斷一次，各種解析共用
+            multiplier = _unit_multiplier(query)
+            budget = self._parse_with_regex(query, multiplier)
+            if not budget.get("lowest_price") and not budget.get("highest_price"):
+                budget = self._parse_with_fallback(query, multiplier)
+            if not budget.get("lowest_price") and not budget.get("highest_price"):
+                budget = await self._parse_with_spacy(query, multiplier)
             if not budget.get("lowest_price") and not budget.get("highest_price"):
                 logger.info(f"[{self.name}] 未提取到預算: {query}")
                 return self.err_result
@@ -90,102 +130,124 @@ class BudgetParserAgent(BaseAgent):
             logger.error(f"[{self.name}] 解析失敗: {e}")
             return self.err_result
 
-    def _parse_amount(self, text: str, query: str) -> int | None:
-        """解析金額並調整單位，低於MIN_VALID_AMOUNT返回None"""
-        amount = float(text.replace(",", ""))
-        if "萬" in query:
-            amount *= 10000
-        elif "k" in query.lower() or "千" in query:
-            amount *= 1000
-        amount = int(amount)
+    def _parse_amount(self, text: str, multiplier: int) -> int | None:
+        """解析金額並乘上單位倍率，低於MIN_VALID_AMOUNT返回None"""
+        amount = int(float(text.replace(",", "")) * multiplier)
         return amount if amount >= self.MIN_VALID_AMOUNT else None
 
-    def _parse_with_regex(self, query: str) -> dict[str, Any]:
+    def _parse_with_regex(self, query: str, multiplier: int) -> dict[str, Any]:
         """使用正則表達式解析預算"""
         budget = {}
+        # 所有模式都需要數字，沒有數字時直接返回
+        if not (first_digit := _DIGIT_RE.search(query)):
+            return budget
+
+        # 範圍、極限、大約與後備方案常落在同一段數字上，同一片段只解析一次
+        amounts: dict[str, int | None] = {}
+
+        def parse_amount(text: str) -> int | None:
+            if text not in amounts:
+                amounts[text] = self._parse_amount(text, multiplier)
+            return amounts[text]
+
+        # 一次掃描取得各模式最左側匹配的位置，命中後再於該位置錨定匹配
+        found = {}
+        if not _PRICE_HINT_CHARS.isdisjoint(query):
+            for m in _PRICE_RE.finditer(query):
+                found.setdefault(m.lastgroup, m.start())
+                if len(found) == len(_PRICE_RE.groupindex):
+                    break
 
         # 範圍模式
-        if match := self.patterns["range"].search(query):
-            min_amount = self._parse_amount(match.group(1), query)
-            max_amount = self._parse_amount(match.group(2), query)
+        if "range" in found:
+            match = _PRICE_PATTERNS["range"].match(query, found["range"])
+            min_amount = parse_amount(match.group(1))
+            max_amount = parse_amount(match.group(2))
             if min_amount and max_amount:
                 budget = {"lowest_price": min_amount, "highest_price": max_amount}
                 return budget
 
-        # 極限模式（最低/最高）
-        if match := self.patterns["limit"].search(query):
-            amount = self._parse_amount(match.group(1), query)
+        # 極限模式（最低/最高），由匹配到的模式決定方向，兩者皆有時取較早出現者
+        if limits := [(found[kind], kind) for kind in ("min", "max") if kind in found]:
+            pos, kind = min(limits)
+            match = _PRICE_PATTERNS[kind].match(query, pos)
+            amount = parse_amount(match.group(1))
             if amount:
-                if any(kw in match.group(0) for kw in ["最低", "至少", "起碼"]):
-                    budget = {"lowest_price": amount, "highest_price": amount * 2}
-                elif any(kw in match.group(0) for kw in ["最高", "最多", "不超過"]):
-                    budget = {"lowest_price": 0, "highest_price": amount}
-                if budget:
-                    return budget
+                if kind == "min":
+                    return {"lowest_price": amount, "highest_price": amount * 2}
+                return {"lowest_price": 0, "highest_price": amount}
 
-        # 大約模式
-        if match := self.patterns["approx"].search(query):
-            amount = self._parse_amount(match.group(1), query)
+        # 大約模式（數字後接單位或「左右」，不會與範圍模式同起點而被遮蔽）
+        if "approx" in found:
+            match = _PRICE_PATTERNS["approx"].match(query, found["approx"])
+            amount = parse_amount(match.group(1))
             if amount:
                 buffer = int(amount * 0.2)
                 budget = {"lowest_price": amount - buffer, "highest_price": amount + buffer}
                 return budget
 
-        # 後備方案
-        if match := self.patterns["any"].search(query):
-            amount = self._parse_amount(match.group(1), query)
-            if amount:
+        # 後備方案：依序取各段數字，略過日期片段，取第一個有效金額
+        digit = first_digit
+        while digit:
+            text = _scan_number(query, digit.start())
+            end = digit.start() + len(text)
+            if not _DATE_SUFFIX_RE.match(query, end) and (amount := parse_amount(text)):
                 buffer = int(amount * 0.2)
-                if any(kw in query for kw in ["最多", "不超過", "最高"]):
+                if _MAX_KW_RE.search(query):
                     budget = {"lowest_price": 0, "highest_price": amount}
                 else:
                     budget = {"lowest_price": amount - buffer, "highest_price": amount + buffer}
                 return budget
+            digit = _DIGIT_RE.search(query, end)
 
         return budget
 
-    def _parse_with_spacy(self, query: str) -> dict[str, Any]:
-        """使用spaCy解析預算"""
-        budget = {}
-        doc = self.nlp(query)
-        matches = self.matcher(doc)
-
-        for _, start, end in matches:
-            span = doc[start:end]
-            nums = [t.text for t in span if t.like_num]
-            if not nums:
-                continue
-
-            if ("-" in span.text or "~" in span.text or "到" in span.text) and len(nums) >= 2:
-                min_amount = self._parse_amount(nums[0], query)
-                max_amount = self._parse_amount(nums[1], query)
+    def _parse_with_fallback(self, query: str, multiplier: int) -> dict[str, Any]:
+        """以後備規則（原spaCy Matcher規則）解析預算，純正則，不需載入spaCy"""
+        for m in _FALLBACK_PRICE_RE.finditer(query):
+            kind = m.lastgroup
+            if kind == "range":
+                min_amount = self._parse_amount(m.group(2), multiplier)
+                max_amount = self._parse_amount(m.group(3), multiplier)
                 if min_amount and max_amount:
                     return {"lowest_price": min_amount, "highest_price": max_amount}
+                # 範圍不成立時，同起點的數字仍視為單一金額
+                amount, end = min_amount, m.end(2)
+            else:
+                # 具名群組之後緊接著其數字群組
+                amount, end = self._parse_amount(m.group(m.lastindex + 1), multiplier), m.end(m.lastindex + 1)
+            # 日期片段中的數字不視為金額
+            if not amount or _DATE_SUFFIX_RE.match(query, end):
                 continue
 
-            amount = self._parse_amount(nums[0], query)
-            if not amount:
-                continue
-
-            if any(kw in span.text for kw in ["最低", "至少", "起碼"]):
+            if kind == "min":
                 return {"lowest_price": amount, "highest_price": amount * 2}
-            if any(kw in span.text for kw in ["最高", "最多", "不超過"]):
+            if kind == "max":
                 return {"lowest_price": 0, "highest_price": amount}
 
             buffer = int(amount * 0.2)
             return {"lowest_price": amount - buffer, "highest_price": amount + buffer}
 
+        return {}
+
+    async def _parse_with_spacy(self, query: str, multiplier: int) -> dict[str, Any]:
+        """使用spaCy的金額實體解析預算"""
+        # 查詢中沒有金額單位時不必分析，也不必載入模型
+        if not _MONEY_UNIT_RE.search(query) or not self._ensure_spacy():
+            return {}
+
+        doc = await analyze("zh_core_web_md", query)
         for ent in doc.ents:
-            if ent.label_ in {"MONEY", "CARDINAL"} and any(unit in query for unit in ["元", "塊", "NT$", "台幣"]):
-                if amount_text := re.search(r"\d+(?:,\d+)?", ent.text):
-                    amount = self._parse_amount(amount_text.group(), query)
+            if ent.label_ in {"MONEY", "CARDINAL"}:
+                if amount_text := _ENT_AMOUNT_RE.search(ent.text):
+                    amount = self._parse_amount(amount_text.group(), multiplier)
                     if amount:
                         buffer = int(amount * 0.2)
-                        if any(kw in query for kw in ["最多", "不超過", "最高"]):
+                        if _MAX_KW_RE.search(query):
                             return {"lowest_price": 0, "highest_price": amount}
                         return {"lowest_price": amount - buffer, "highest_price": amount + buffer}
 
-        return budget
+        return {}
 
     def _is_valid_budget(self, budget: dict[str, Any]) -> bool:
         """檢查預算是否有效"""
@@ -3,101 +3,128 @@
 """
 
 import re
-from datetime import datetime, timedelta
-from typing import Any, ClassVar
+from datetime import date, datetime, timedelta
+from typing import Any
 
-import spacy
 from loguru import logger
-from spacy.matcher import Matcher
 
 from src.agents.base.base_agent import BaseAgent
-from src.utils.nlp_utils import get_shared_spacy_model
+from src.utils.nlp_utils import analyze, get_shared_spacy_model
+
+# 月日與日期範圍模式，模組載入時編譯一次
+_MONTH_DAY_RE = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)")
+_FULL_RANGE_RE = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)(?:至|到|-|~)(\d{1,2})月(\d{1,2})(?:日|號)")
+_SAME_MONTH_RANGE_RE = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)(?:至|到|-|~)(\d{1,2})(?:日|號)")
+
+# 日期格式：YYYY-MM-DD（或/）、MM-DD（或/）、中文X月X日/X號
+# 各格式分別掃描，彼此重疊的匹配（如「1-12月24日」）都保留
+_YMD_RE = re.compile(r"(\d{4})[/-](\d{1,2})[/-](\d{1,2})")
+_MD_RE = re.compile(r"(\d{1,2})[/-](\d{1,2})")
+_CN_DATE_RE = re.compile(r"(\d{1,2})月(\d{1,2})[日號]")
+
+# 匹配片段的種類，依優先順序：含範圍分隔符、含月與日/號、週末、下週
+_SPAN_KIND_RE = re.compile(
+    r"(?P<range>.*?[至到~-])"
+    r"|(?P<single>(?=.*月).*?[日號])"
+    r"|(?P<weekend>.*?[週周]末)"
+    r"|(?P<next_week>.*?下(?:週|星期|周))",
+    re.DOTALL,
+)
+
+# 任一解析路徑能產生日期的必要字元：數字、今/明/後（相對日期）、末（週末）、下（下週）
+_DATE_HINT_RE = re.compile(r"[\d今明後末下]")
+
+# 星期字與相對週一的位移（日/天皆為週日）
+_WEEKDAY_CHARS = "一二三四五六日天"
+_WEEKDAY_OFFSETS = (0, 1, 2, 3, 4, 5, 6, 6)
+
+# 相對日期詞與距今天數
+_RELATIVE_DAYS = {"今天": 0, "今日": 0, "今晚": 0, "明天": 1, "明日": 1, "後天": 2, "後日": 2, "大後天": 3}
+
+
+def _relative_day_strings(today: datetime) -> list[str]:
+    """今天至大後天的日期字串，依距今天數索引"""
+    base = today.date()
+    return [(base + timedelta(days=offset)).isoformat() for offset in range(4)]
 
 
 class DateParserAgent(BaseAgent):
     """日期解析子Agent"""
 
-    # 靜態共享的spaCy模型
-    _shared_nlp: ClassVar[spacy.Language | None] = None
-
     def __init__(self):
         """初始化日期解析子Agent"""
         super().__init__("DateParserAgent")
-        # 日期正則表達式模式
-        self.date_patterns = [
-            # YYYY-MM-DD 或 YYYY/MM/DD
-            re.compile(r"(\d{4})[/-](\d{1,2})[/-](\d{1,2})"),
-            # MM-DD 或 MM/DD
-            re.compile(r"(\d{1,2})[/-](\d{1,2})"),
-            # 中文日期格式：X月X日
-            re.compile(r"(\d{1,2})月(\d{1,2})日"),
-            # 中文日期格式：X月X號
-            re.compile(r"(\d{1,2})月(\d{1,2})號"),
-        ]
         self.err_result = {
             "error": "日期解析失敗",
             "err_msg": " 不好意思，似乎無法確認您的入住日期，麻煩您加上月/日再提供一次。",
         }
 
-        # 初始化spaCy模型
-        self.spacy_available = False
-        try:
-            # 嘗試獲取共享的spaCy模型
-            self.nlp = get_shared_spacy_model("zh_core_web_md")
-            self.spacy_available = True
-            logger.info("成功載入spaCy中文模型用於日期解析")
-
-            # 設置spaCy匹配器
-            self.matcher = Matcher(self.nlp.vocab)
+        # spaCy模型與匹配器延遲到首次解析時才載入，None 表示尚未嘗試
+        self.spacy_available: bool | None = None
 
-            # 添加日期匹配模式
-            self.matcher.add(
-                "DATE_PATTERN",
+    def _ensure_spacy(self) -> bool:
+        """首次需要時載入spaCy模型與匹配器，返回是否可用"""
+        if self.spacy_available is None:
+            try:
+                self.nlp = get_shared_spacy_model("zh_core_web_md")
+                self._init_spacy_matcher()
+                self.spacy_available = True
+                logger.info("成功載入spaCy中文模型用於日期解析")
+            except Exception as e:
+                self.spacy_available = False
+                logger.warning(f"無法載入spaCy中文模型用於日期解析: {e!s}，將使用正則表達式解析")
+        return self.spacy_available
+
+    def _init_spacy_matcher(self):
+        """初始化spaCy匹配器"""
+        from spacy.matcher import Matcher
+
+        self.matcher = Matcher(self.nlp.vocab)
+
+        # 添加日期匹配模式
+        self.matcher.add(
+            "DATE_PATTERN",
+            [
+                # X月X日
                 [
-                    # X月X日
-                    [
-                        {"LIKE_NUM": True},
-                        {"TEXT": "月"},
-                        {"LIKE_NUM": True},
-                        {"TEXT": {"IN": ["日", "號"]}},
-                    ],
-                    # X月X日至Y月Z日
-                    [
-                        {"LIKE_NUM": True},
-                        {"TEXT": "月"},
-                        {"LIKE_NUM": True},
-                        {"TEXT": {"IN": ["日", "號"]}},
-                        {"TEXT": {"IN": ["至", "到", "-", "~"]}},
-                        {"LIKE_NUM": True},
-                        {"TEXT": "月"},
-                        {"LIKE_NUM": True},
-                        {"TEXT": {"IN": ["日", "號"]}},
-                    ],
-                    # X日至Y日
-                    [
-                        {"LIKE_NUM": True},
-                        {"TEXT": {"IN": ["日", "號"]}},
-                        {"TEXT": {"IN": ["至", "到", "-", "~"]}},
-                        {"LIKE_NUM": True},
-                        {"TEXT": {"IN": ["日", "號"]}},
-                    ],
-                    # 今天/明天/後天
-                    [{"TEXT": {"IN": ["今天", "今晚", "明天", "後天", "大後天"]}}],
-                    # 這週末/下週末
-                    [{"TEXT": {"IN": ["這", "這個"]}}, {"TEXT": "週末"}],
-                    [{"TEXT": {"IN": ["下", "下個"]}}, {"TEXT": "週末"}],
-                    # 下週一/二/三...
-                    [
-                        {"TEXT": {"IN": ["下", "下個"]}},
-                        {"TEXT": {"IN": ["週", "星期"]}},
-                        {"TEXT": {"IN": ["一", "二", "三", "四", "五", "六", "日", "天"]}},
-                    ],
+                    {"LIKE_NUM": True},
+                    {"TEXT": "月"},
+                    {"LIKE_NUM": True},
+                    {"TEXT": {"IN": ["日", "號"]}},
                 ],
-            )
-
-        except Exception as e:
-            logger.warning(f"無法載入spaCy中文模型用於日期解析: {e!s}，將使用正則表達式解析")
-            self.spacy_available = False
+                # X月X日至Y月Z日
+                [
+                    {"LIKE_NUM": True},
+                    {"TEXT": "月"},
+                    {"LIKE_NUM": True},
+                    {"TEXT": {"IN": ["日", "號"]}},
+                    {"TEXT": {"IN": ["至", "到", "-", "~"]}},
+                    {"LIKE_NUM": True},
+                    {"TEXT": "月"},
+                    {"LIKE_NUM": True},
+                    {"TEXT": {"IN": ["日", "號"]}},
+                ],
+                # X日至Y日
+                [
+                    {"LIKE_NUM": True},
+                    {"TEXT": {"IN": ["日", "號"]}},
+                    {"TEXT": {"IN": ["至", "到", "-", "~"]}},
+                    {"LIKE_NUM": True},
+                    {"TEXT": {"IN": ["日", "號"]}},
+                ],
+                # 今天/明天/後天
+                [{"TEXT": {"IN": ["今天", "今晚", "明天", "後天", "大後天"]}}],
+                # 這週末/下週末
+                [{"TEXT": {"IN": ["這", "這個"]}}, {"TEXT": "週末"}],
+                [{"TEXT": {"IN": ["下", "下個"]}}, {"TEXT": "週末"}],
+                # 下週一/二/三...
+                [
+                    {"TEXT": {"IN": ["下", "下個"]}},
+                    {"TEXT": {"IN": ["週", "星期"]}},
+                    {"TEXT": {"IN": ["一", "二", "三", "四", "五", "六", "日", "天"]}},
+                ],
+            ],
+        )
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理查詢中的旅遊日期"""
@@ -105,16 +132,23 @@ class DateParserAgent(BaseAgent):
         context = state.get("context", {})
 
         logger.debug(f"[{self.name}] 開始解析日期")
+        # 沒有任何日期線索時，spaCy、正則與推斷都不會有結果
+        if not _DATE_HINT_RE.search(query):
+            return self.err_result
+
         try:
+            # 整個請求共用同一個當下時間，避免跨越午夜時各步驟的今天不一致
+            now = datetime.now()
+
             # 首先嘗試使用spaCy解析日期
             dates = {}
-            if self.spacy_available:
-                dates = self._extract_dates_with_spacy(query)
+            if self._ensure_spacy():
+                dates = await self._extract_dates_with_spacy(query, now)
                 logger.debug(f"[{self.name}] spaCy解析結果: {dates}")
 
             # 如果spaCy無法解析，嘗試使用正則表達式
             if not dates.get("check_in") or not dates.get("check_out"):
-                regex_dates = self._extract_dates_with_regex(query)
+                regex_dates = self._extract_dates_with_regex(query, now)
                 logger.debug(f"[{self.name}] 正則表達式解析結果: {regex_dates}")
 
                 # 合併結果，優先使用已解析的結果
@@ -125,7 +159,7 @@ class DateParserAgent(BaseAgent):
 
             # 如果仍然無法解析，嘗試根據上下文推斷
             if not dates.get("check_in") or not dates.get("check_out"):
-                inferred_dates = self._infer_dates(query)
+                inferred_dates = self._infer_dates(query, now)
                 logger.debug(f"[{self.name}] 推斷日期結果: {inferred_dates}")
 
                 # 合併結果，優先使用已解析的結果
@@ -135,7 +169,7 @@ class DateParserAgent(BaseAgent):
                     dates["check_out"] = inferred_dates["check_out"]
 
             # 驗證日期的有效性
-            self._validate_dates(dates)
+            self._validate_dates(dates, now.date())
 
             logger.info(
                 f"[{self.name}] 解析結果：入住 {dates.get('check_in', '未知')}，退房 {dates.get('check_out', '未知')}"
@@ -147,12 +181,12 @@ class DateParserAgent(BaseAgent):
 
             # 確保退房日期在入住日期之後
             if dates.get("check_in") and dates.get("check_out"):
-                check_in_date = datetime.strptime(dates["check_in"], "%Y-%m-%d")
-                checkout_date = datetime.strptime(dates["check_out"], "%Y-%m-%d")
+                check_in_date = date.fromisoformat(dates["check_in"])
+                checkout_date = date.fromisoformat(dates["check_out"])
                 if check_in_date >= checkout_date:
                     # 如果退房日期不在入住日期之後，設置為入住日期後一天
                     checkout_date = check_in_date + timedelta(days=1)
-                    dates["check_out"] = checkout_date.strftime("%Y-%m-%d")
+                    dates["check_out"] = checkout_date.isoformat()
                     logger.warning(f"[{self.name}] 退房日期不在入住日期之後，自動調整為：{dates['check_out']}")
 
             return dates
@@ -162,61 +196,56 @@ class DateParserAgent(BaseAgent):
 
             return self.err_result
 
-    def _extract_dates_with_spacy(self, query: str) -> dict[str, str]:
+    async def _extract_dates_with_spacy(self, query: str, today: datetime) -> dict[str, str]:
         """使用spaCy從查詢中提取日期"""
-        if not self.spacy_available:
+        # 查詢中沒有任何日期線索時不必分析
+        if not self._ensure_spacy() or not _DATE_HINT_RE.search(query):
             return {"check_in": None, "check_out": None}
 
         dates = {"check_in": None, "check_out": None}
         all_dates = []
-        current_year = datetime.now().year
-        today = datetime.now()
+        current_year = today.year
+        relative_days = _relative_day_strings(today)
 
         # 解析文本
-        doc = self.nlp(query)
+        doc = await analyze("zh_core_web_md", query)
 
         # 首先檢查是否有DATE實體
         for ent in doc.ents:
             if ent.label_ == "DATE":
                 logger.debug(f"spaCy識別到DATE實體: {ent.text}")
                 # 嘗試解析日期實體
-                date_str = self._parse_date_entity(ent.text, current_year, today)
+                date_str = self._parse_date_entity(ent.text, current_year, relative_days)
                 if date_str:
                     all_dates.append(date_str)
 
         # 使用匹配器查找匹配項
         matches = self.matcher(doc)
-        today_str = today.strftime("%Y-%m-%d")
 
         for _, start, end in matches:
             text = doc[start:end].text
             logger.debug(f"spaCy匹配到日期表達: {text}")
-            
-            match text:
-                case t if any(m in t for m in "至到-~"):
+
+            # 今天/明天等固定詞直接查表，其餘片段以一次匹配判斷種類
+            if (offset := _RELATIVE_DAYS.get(text)) is not None:
+                all_dates.append(relative_days[offset])
+                continue
+            if not (kind := _SPAN_KIND_RE.match(text)):
+                continue
+
+            match kind.lastgroup:
+                case "range":
                     date_range = self._parse_date_range(text, current_year)
                     if date_range and len(date_range) == 2:
                         dates["check_in"], dates["check_out"] = date_range
                         return dates
-                
-                case t if "月" in t and ("日" in t or "號" in t):
+
+                case "single":
                     if date_str := self._parse_single_date(text, current_year):
                         all_dates.append(date_str)
-                
-                case "今天" | "今晚":
-                    all_dates.append(today_str)
-                
-                case "明天":
-                    all_dates.append((today + timedelta(days=1)).strftime("%Y-%m-%d"))
-                
-                case "後天":
-                    all_dates.append((today + timedelta(days=2)).strftime("%Y-%m-%d"))
-                
-                case "大後天":
-                    all_dates.append((today + timedelta(days=3)).strftime("%Y-%m-%d"))
-                
-                case t if "週末" in t or "周末" in t:
-                    is_next = "下" in t or "下個" in t
+
+                case "weekend":
+                    is_next = "下" in text
                     offset = 7 if is_next else 0
                     days_to_sat = (5 - today.weekday()) % 7 + offset
                     sat = today + timedelta(days=days_to_sat)
@@ -224,14 +253,13 @@ class DateParserAgent(BaseAgent):
                         sat.strftime("%Y-%m-%d"),
                         (sat + timedelta(days=1)).strftime("%Y-%m-%d")
                     ])
-                
-                case t if any(m in t for m in ["下週", "下星期", "下周"]):
-                    for day, offset in {"一": 0, "二": 1, "三": 2, "四": 3, "五": 4, "六": 5, "日": 6, "天": 6}.items():
-                        if day in t:
-                            days_to_mon = (7 - today.weekday()) % 7 or 7
-                            next_day = today + timedelta(days=days_to_mon + offset)
-                            all_dates.append(next_day.strftime("%Y-%m-%d"))
-                            break
+
+                case "next_week":
+                    # 匹配規則以星期字結尾，直接查表取得相對週一的位移
+                    if (index := _WEEKDAY_CHARS.find(text[-1])) >= 0:
+                        days_to_mon = (7 - today.weekday()) % 7 or 7
+                        next_day = today + timedelta(days=days_to_mon + _WEEKDAY_OFFSETS[index])
+                        all_dates.append(next_day.strftime("%Y-%m-%d"))
 
         # 如果找到至少兩個日期，假設第一個是入住日期，第二個是退房日期
         if len(all_dates) >= 2:
@@ -242,28 +270,21 @@ class DateParserAgent(BaseAgent):
         elif len(all_dates) == 1:
             # 如果只找到一個日期，假設是入住日期，退房日期為入住日期後的第二天
             dates["check_in"] = all_dates[0]
-            check_in_date = datetime.strptime(all_dates[0], "%Y-%m-%d")
+            check_in_date = date.fromisoformat(all_dates[0])
             check_out_date = check_in_date + timedelta(days=1)
-            dates["check_out"] = check_out_date.strftime("%Y-%m-%d")
+            dates["check_out"] = check_out_date.isoformat()
 
         return dates
 
-    def _parse_date_entity(self, text: str, current_year: int, today: datetime) -> str | None:
+    def _parse_date_entity(self, text: str, current_year: int, relative_days: list[str]) -> str | None:
         """解析日期實體文本"""
         try:
             # 處理常見的日期表達
-            if text in ["今天", "今日", "今晚"]:
-                return today.strftime("%Y-%m-%d")
-            if text in ["明天", "明日"]:
-                return (today + timedelta(days=1)).strftime("%Y-%m-%d")
-            if text in ["後天", "後日"]:
-                return (today + timedelta(days=2)).strftime("%Y-%m-%d")
-            if text == "大後天":
-                return (today + timedelta(days=3)).strftime("%Y-%m-%d")
+            if text in _RELATIVE_DAYS:
+                return relative_days[_RELATIVE_DAYS[text]]
 
             # 處理"X月X日"格式
-            month_day_pattern = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)")
-            match = month_day_pattern.search(text)
+            match = _MONTH_DAY_RE.search(text)
             if match:
                 month, day = int(match.group(1)), int(match.group(2))
                 return f"{current_year:04d}-{month:02d}-{day:02d}"
@@ -276,8 +297,7 @@ class DateParserAgent(BaseAgent):
         """解析日期範圍表達，如"5月1日至5月3日"或"5月1日至3日" """
         try:
             # 處理"X月X日至Y月Z日"格式
-            full_range_pattern = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)(?:至|到|-|~)(\d{1,2})月(\d{1,2})(?:日|號)")
-            match = full_range_pattern.search(text)
+            match = _FULL_RANGE_RE.search(text)
             if match:
                 month1, day1, month2, day2 = (
                     int(match.group(1)),
@@ -290,8 +310,7 @@ class DateParserAgent(BaseAgent):
                 return [date1, date2]
 
             # 處理"X月X日至Z日"格式（同月不同日）
-            same_month_pattern = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)(?:至|到|-|~)(\d{1,2})(?:日|號)")
-            match = same_month_pattern.search(text)
+            match = _SAME_MONTH_RANGE_RE.search(text)
             if match:
                 month, day1, day2 = int(match.group(1)), int(match.group(2)), int(match.group(3))
                 date1 = f"{current_year:04d}-{month:02d}-{day1:02d}"
@@ -306,8 +325,7 @@ class DateParserAgent(BaseAgent):
         """解析單個日期表達，如"5月1日" """
         try:
             # 處理"X月X日"格式
-            pattern = re.compile(r"(\d{1,2})月(\d{1,2})(?:日|號)")
-            match = pattern.search(text)
+            match = _MONTH_DAY_RE.search(text)
             if match:
                 month, day = int(match.group(1)), int(match.group(2))
                 return f"{current_year:04d}-{month:02d}-{day:02d}"
@@ -316,30 +334,28 @@ class DateParserAgent(BaseAgent):
         except (ValueError, IndexError):
             return None
 
-    def _extract_dates_with_regex(self, query: str) -> dict[str, str]:
+    def _extract_dates_with_regex(self, query: str, now: datetime) -> dict[str, str]:
         """使用正則表達式從查詢中提取日期"""
         dates = {"check_in": None, "check_out": None}
 
         # 提取所有可能的日期
         all_dates = []
-        current_year = datetime.now().year
-
-        for pattern in self.date_patterns:
-            matches = pattern.findall(query)
-            for match in matches:
-                try:
-                    if len(match) == 3:  # YYYY-MM-DD
-                        year, month, day = int(match[0]), int(match[1]), int(match[2])
-                        date_str = f"{year:04d}-{month:02d}-{day:02d}"
-                    elif len(match) == 2:  # MM-DD 或 中文日期
-                        month, day = int(match[0]), int(match[1])
-                        date_str = f"{current_year:04d}-{month:02d}-{day:02d}"
-
-                    # 驗證日期有效性
-                    datetime.strptime(date_str, "%Y-%m-%d")
-                    all_dates.append(date_str)
-                except (ValueError, IndexError):
-                    continue
+        current_year = now.year
+
+        # 完整年月日的位置，落在其中的MM-DD（如「2012-1-2」中的「12-1」）不另計
+        ymd_spans = []
+        for match in _YMD_RE.finditer(query):
+            ymd_spans.append(match.span())
+            self._append_date(all_dates, int(match[1]), int(match[2]), int(match[3]))
+
+        for match in _MD_RE.finditer(query):
+            start, end = match.span()
+            if any(s <= start and end <= e for s, e in ymd_spans):
+                continue
+            self._append_date(all_dates, current_year, int(match[1]), int(match[2]))
+
+        for match in _CN_DATE_RE.finditer(query):
+            self._append_date(all_dates, current_year, int(match[1]), int(match[2]))
 
         # 如果找到至少兩個日期，假設第一個是入住日期，第二個是退房日期
         if len(all_dates) >= 2:
@@ -350,29 +366,32 @@ class DateParserAgent(BaseAgent):
         elif len(all_dates) == 1:
             # 如果只找到一個日期，假設是入住日期，退房日期為入住日期後的第二天
             dates["check_in"] = all_dates[0]
-            check_in_date = datetime.strptime(all_dates[0], "%Y-%m-%d")
+            check_in_date = date.fromisoformat(all_dates[0])
             check_out_date = check_in_date + timedelta(days=1)
-            dates["check_out"] = check_out_date.strftime("%Y-%m-%d")
+            dates["check_out"] = check_out_date.isoformat()
 
         return dates
 
-    def _infer_dates(self, query: str) -> dict[str, str]:
+    @staticmethod
+    def _append_date(all_dates: list[str], year: int, month: int, day: int) -> None:
+        """建立date即驗證日期有效性，有效才加入列表"""
+        try:
+            all_dates.append(date(year, month, day).isoformat())
+        except ValueError:
+            pass
+
+    def _infer_dates(self, query: str, today: datetime) -> dict[str, str]:
         """根據查詢內容推斷日期"""
         dates = {"check_in": None, "check_out": None}
-        today = datetime.now()
+        relative_days = _relative_day_strings(today)
 
         # 檢查是否包含特定關鍵詞
         if "今天" in query or "今晚" in query:
-            dates["check_in"] = today.strftime("%Y-%m-%d")
-            dates["check_out"] = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+            dates["check_in"], dates["check_out"] = relative_days[0], relative_days[1]
         elif "明天" in query:
-            tomorrow = today + timedelta(days=1)
-            dates["check_in"] = tomorrow.strftime("%Y-%m-%d")
-            dates["check_out"] = (tomorrow + timedelta(days=1)).strftime("%Y-%m-%d")
+            dates["check_in"], dates["check_out"] = relative_days[1], relative_days[2]
         elif "後天" in query:
-            day_after_tomorrow = today + timedelta(days=2)
-            dates["check_in"] = day_after_tomorrow.strftime("%Y-%m-%d")
-            dates["check_out"] = (day_after_tomorrow + timedelta(days=1)).strftime("%Y-%m-%d")
+            dates["check_in"], dates["check_out"] = relative_days[2], relative_days[3]
         elif "這週末" in query or "這個週末" in query:
             # 計算到本週六的天數
             days_until_saturday = (5 - today.weekday()) % 7
@@ -395,19 +414,18 @@ class DateParserAgent(BaseAgent):
 
         return dates
 
-    def _validate_dates(self, dates: dict[str, str]) -> None:
+    def _validate_dates(self, dates: dict[str, str], today: date) -> None:
         """驗證日期的有效性"""
-        today = datetime.now().date()
 
         # 檢查入住日期
         if dates.get("check_in"):
             try:
-                check_in_date = datetime.strptime(dates["check_in"], "%Y-%m-%d").date()
+                check_in_date = date.fromisoformat(dates["check_in"])
 
                 # 入住日期不能早於今天
                 if check_in_date < today:
                     logger.warning(f"入住日期 {dates['check_in']} 早於今天，設置為今天")
-                    dates["check_in"] = today.strftime("%Y-%m-%d")
+                    dates["check_in"] = today.isoformat()
             except ValueError:
                 logger.error(f"無效的入住日期格式: {dates['check_in']}")
                 dates["check_in"] = None
@@ -415,16 +433,16 @@ class DateParserAgent(BaseAgent):
         # 檢查退房日期
         if dates.get("check_out"):
             try:
-                check_out_date = datetime.strptime(dates["check_out"], "%Y-%m-%d").date()
+                check_out_date = date.fromisoformat(dates["check_out"])
 
                 # 如果有入住日期，退房日期必須晚於入住日期
                 if dates.get("check_in"):
-                    check_in_date = datetime.strptime(dates["check_in"], "%Y-%m-%d").date()
+                    check_in_date = date.fromisoformat(dates["check_in"])
                     if check_out_date <= check_in_date:
                         logger.warning(
                             f"退房日期 {dates['check_out']} 不晚於入住日期 {dates['check_in']}，設置為入住日期後一天"
                         )
-                        dates["check_out"] = (check_in_date + timedelta(days=1)).strftime("%Y-%m-%d")
+                        dates["check_out"] = (check_in_date + timedelta(days=1)).isoformat()
             except ValueError:
                 logger.error(f"無效的退房日期格式: {dates['check_out']}")
                 dates["check_out"] = None
@@ -3,12 +3,41 @@
 """
 
 import re
+from functools import lru_cache
 from typing import Any
 
 from loguru import logger
 
 from src.agents.base.base_agent import BaseAgent
 
+# 各餐別的肯定與否定關鍵字
+_MEAL_KEYWORDS = {
+    "breakfast": (
+        ("早餐", "早點", "早飯", "早上吃的", "含早", "供應早餐", "提供早餐", "有早餐", "要早餐"),
+        ("不要早餐", "不含早餐", "不需要早餐", "沒有早餐"),
+    ),
+    "lunch": (
+        ("午餐", "午飯", "中餐", "中午吃的", "含午", "供應午餐", "提供午餐", "有午餐", "要午餐"),
+        ("不要午餐", "不含午餐", "不需要午餐", "沒有午餐"),
+    ),
+    "dinner": (
+        ("晚餐", "晚飯", "晚上吃的", "含晚", "供應晚餐", "提供晚餐", "有晚餐", "要晚餐"),
+        ("不要晚餐", "不含晚餐", "不需要晚餐", "沒有晚餐"),
+    ),
+}
+
+# 所有關鍵字合併為一個正則；否定群組排在前面，同一位置優先匹配否定表達
+_FOOD_REQ_RE = re.compile(
+    "|".join(
+        [f"(?P<no_{meal}>{'|'.join(negatives)})" for meal, (_, negatives) in _MEAL_KEYWORDS.items()]
+        + [f"(?P<{meal}>{'|'.join(positives)})" for meal, (positives, _) in _MEAL_KEYWORDS.items()]
+    )
+)
+# 群組名稱對應到（結果欄位, 是否需要）
+_FOOD_REQ_GROUPS = {f"no_{meal}": (f"has_{meal}", False) for meal in _MEAL_KEYWORDS} | {
+    meal: (f"has_{meal}", True) for meal in _MEAL_KEYWORDS
+}
+
 
 class FoodReqParserAgent(BaseAgent):
     """食物需求解析子Agent"""
@@ -16,24 +45,12 @@ class FoodReqParserAgent(BaseAgent):
     def __init__(self):
         """初始化食物需求解析子Agent"""
         super().__init__("FoodReqParserAgent")
-        self.breakfast_patterns = [
-            re.compile(r"(?:早餐|早點|早飯|早上吃的|含早|供應早餐|提供早餐|有早餐|要早餐)"),
-            re.compile(r"(?:不要早餐|不含早餐|不需要早餐|沒有早餐)"),
-        ]
-
-        self.lunch_patterns = [
-            re.compile(r"(?:午餐|午飯|中餐|中午吃的|含午|供應午餐|提供午餐|有午餐|要午餐)"),
-            re.compile(r"(?:不要午餐|不含午餐|不需要午餐|沒有午餐)"),
-        ]
-
-        self.dinner_patterns = [
-            re.compile(r"(?:晚餐|晚飯|晚上吃的|含晚|供應晚餐|提供晚餐|有晚餐|要晚餐)"),
-            re.compile(r"(?:不要晚餐|不含晚餐|不需要晚餐|沒有晚餐)"),
-        ]
+        # 解析結果只取決於查詢字串，以 LRU 快取重複查詢；每次回傳快取結果的副本
+        self._food_req_cached = lru_cache(maxsize=4096)(self._scan_food_req)
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理餐食需求解析請求"""
-        logger.debug(f"[{self.name}] 開始處理餐食需求解析請求")
+        logger.debug("[{}] 開始處理餐食需求解析請求", self.name)
 
         # 從輸入中提取查詢和上下文
         query = state.get("query", "")
@@ -61,46 +78,22 @@ class FoodReqParserAgent(BaseAgent):
             }
 
     def _extract_food_req_with_regex(self, query: str) -> dict[str, bool]:
-        """使用正則表達式從查詢中提取餐食需求"""
-        food_req = {"has_breakfast": False, "has_lunch": False, "has_dinner": False}
+        """使用正則表達式從查詢中提取餐食需求，相同查詢直接取用快取結果"""
+        return dict(self._food_req_cached(query))
 
-        # 檢查早餐需求
-        for pattern in self.breakfast_patterns:
-            match = pattern.search(query)
-            if match:
-                # 檢查是否是否定表達
-                matched_text = match.group(0)
-                if "不" in matched_text or "沒" in matched_text:
-                    food_req["has_breakfast"] = False
-                else:
-                    food_req["has_breakfast"] = True
-                logger.debug(f"從查詢中提取到早餐需求: {food_req['has_breakfast']}")
-                break
-
-        # 檢查午餐需求
-        for pattern in self.lunch_patterns:
-            match = pattern.search(query)
-            if match:
-                # 檢查是否是否定表達
-                matched_text = match.group(0)
-                if "不" in matched_text or "沒" in matched_text:
-                    food_req["has_lunch"] = False
-                else:
-                    food_req["has_lunch"] = True
-                logger.debug(f"從查詢中提取到午餐需求: {food_req['has_lunch']}")
-                break
-
-        # 檢查晚餐需求
-        for pattern in self.dinner_patterns:
-            match = pattern.search(query)
-            if match:
-                # 檢查是否是否定表達
-                matched_text = match.group(0)
-                if "不" in matched_text or "沒" in matched_text:
-                    food_req["has_dinner"] = False
-                else:
-                    food_req["has_dinner"] = True
-                logger.debug(f"從查詢中提取到晚餐需求: {food_req['has_dinner']}")
-                break
+    def _scan_food_req(self, query: str) -> dict[str, bool]:
+        """掃描查詢中的餐食關鍵字，結果由 _food_req_cached 快取"""
+        food_req = {"has_breakfast": False, "has_lunch": False, "has_dinner": False}
 
+        # 一次掃描所有餐別；否定表達優先於肯定表達，不論出現先後
+        negated = set()
+        for match in _FOOD_REQ_RE.finditer(query):
+            field, wanted = _FOOD_REQ_GROUPS[match.lastgroup]
+            if not wanted:
+                negated.add(field)
+                food_req[field] = False
+            elif field not in negated:
+                food_req[field] = True
+
+        logger.debug("從查詢中提取到餐食需求: {}", food_req)
         return food_req
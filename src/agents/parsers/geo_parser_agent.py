@@ -72,24 +72,14 @@ class GeoParserAgent(BaseAgent):
                 result["county_ids"] = [geo_entities["destination"]["county"]]
 
                 # 查找縣市名稱
-                county_name = None
-                for county in geo_entities["counties"]:
-                    if county["id"] == geo_entities["destination"]["county"]:
-                        county_name = county["name"]
-                        break
-                result["county_name"] = county_name
+                result["county_name"] = geo_cache._county_name_by_id.get(geo_entities["destination"]["county"])
 
             # 如果有鄉鎮區信息，添加到鄉鎮區ID列表
             if geo_entities["destination"]["district"]:
                 result["district_ids"] = [geo_entities["destination"]["district"]]
 
                 # 查找鄉鎮區名稱
-                district_name = None
-                for district in geo_entities["districts"]:
-                    if district["id"] == geo_entities["destination"]["district"]:
-                        district_name = district["name"]
-                        break
-                result["district_name"] = district_name
+                result["district_name"] = geo_cache._district_name_by_id.get(geo_entities["destination"]["district"])
 
             return result
 
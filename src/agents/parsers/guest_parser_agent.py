@@ -2,145 +2,245 @@
 人數解析子Agent，專門負責解析查詢中的人數信息
 """
 
+from __future__ import annotations
+
 import re
-from typing import Any, ClassVar
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-import spacy
 from loguru import logger
-from spacy.matcher import Matcher
 
 from src.agents.base.base_agent import BaseAgent
 from src.utils.nlp_utils import get_shared_spacy_model
 
+# spaCy匯入耗時，延遲到正則解析失敗、需要匹配器時才匯入
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+# 人數解析用的正則片段
+_UNIT = r"(?:個|位|名)?"
+_ADULT = r"(?:大人|成人|大)"
+_CHILD = r"(?:小孩|兒童|孩子|小|嬰兒)"
+_CONN = r"(?:，|,|、|。|\s)"
+_NUM = r"(?:\d+|[一二三四五六七八九十兩两])"
+
+# 中文數字對照表，所有實例共用
+_CN_DIGITS = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10, "兩": 2, "两": 2}
+
+# 人數上限與有效人數（1～上限）的數字文字對照表，涵蓋阿拉伯數字與中文數字
+_MAX_GUESTS = 10
+_GUEST_NUMBERS = {str(n): n for n in range(1, _MAX_GUESTS + 1)} | _CN_DIGITS
+
+# spaCy匹配器規則使用的詞彙集合
+_ADULT_WORDS = frozenset({"大", "大人", "成人"})
+_CHILD_WORDS = frozenset({"小", "小孩", "兒童", "孩子"})
+_UNIT_WORDS = frozenset({"個", "位", "名"})
+_PERSON_WORDS = frozenset({"人", "位"})
+
+# 各類人數模式依優先順序排列，群組名稱以類別為前綴避免重名
+# 「2大1小」已被 _ADULT/_CHILD 的單字別名涵蓋，不需另開分支
+_GUEST_PATTERN_SOURCES = (
+    ("direct", rf"(?:{_ADULT}\s*)?(?P<direct_adults>{_NUM})\s*{_UNIT}{_ADULT}\s*(?P<direct_children>{_NUM})\s*{_UNIT}{_CHILD}"),
+    (
+        "total",
+        rf"(?:一共|總共|共|全家)?\s*(?P<total_count>{_NUM})\s*{_UNIT}(?:人|位){_CONN}(?:其中|包括|含|包含)?\s*(?P<total_children>{_NUM})\s*{_UNIT}{_CHILD}",
+    ),
+    ("family", rf"(?:一家|全家|我們是)?(?P<family_count>{_NUM})口(?:之)?(?:家|家庭)?"),
+    (
+        "special",
+        r"夫妻|兩口子|夫婦|伴侶|情侶|一對|我(?:和|與|跟)(?:太太|老婆|妻子|先生|老公|丈夫)|父母|爸媽|爸爸媽媽|家長|(?P<grandparents>祖父母|爺爺奶奶|外公外婆)",
+    ),
+)
+
+# 合併為單一正則，模組載入時編譯一次，以 finditer 單次掃描查詢並依 lastgroup 分派
+_GUEST_RE = re.compile("|".join(f"(?P<{name}>{source})" for name, source in _GUEST_PATTERN_SOURCES))
+# 每個人數模式的匹配必含其中至少一字，用於快速略過無關查詢
+_GUEST_HINT_CHARS = frozenset("大人位口夫侶對我母媽家爺婆")
+# spaCy匹配規則與「大X小」詞序回退必含其中至少一字
+_SPACY_HINT_CHARS = frozenset("大人位")
+# 各類模式的獨立正則，僅在合併掃描的匹配皆無效時回退使用（匹配可能互相重疊而被吃掉）
+_GUEST_PATTERNS = {name: re.compile(source) for name, source in _GUEST_PATTERN_SOURCES}
+
 
 class GuestParserAgent(BaseAgent):
     """人數解析子Agent"""
 
-    _shared_nlp: ClassVar[spacy.Language | None] = None
-    MAX_GUESTS = 10
+    MAX_GUESTS = _MAX_GUESTS
 
     def __init__(self):
         super().__init__("GuestParserAgent")
-        self._init_regex_patterns()
-        self.spacy_available = False
-        try:
-            self.nlp = get_shared_spacy_model("zh_core_web_md")
-            self.spacy_available = True
-            logger.info("成功載入spaCy中文模型")
-            self._init_spacy_matcher()
-        except Exception as e:
-            logger.warning(f"無法載入spaCy模型: {e!s}，將使用正則表達式")
-        self.chinese_nums = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10, "兩": 2, "两": 2}
-
-    def _init_regex_patterns(self):
-        """初始化正則表達式模式"""
-        unit = r"(?:個|位|名)?"
-        adult = r"(?:大人|成人|大)"
-        child = r"(?:小孩|兒童|孩子|小|嬰兒)"
-        conn = r"(?:，|,|、|。|\s)"
-        num = r"(\d+|[一二三四五六七八九十兩两])"
-        self.patterns = {
-            "direct": re.compile(rf"(?:{adult}\s*)?{num}\s*{unit}{adult}\s*{num}\s*{unit}{child}|{num}\s*大\s*{num}\s*小"),
-            "total": re.compile(rf"(?:一共|總共|共|全家)?\s*{num}\s*{unit}(?:人|位){conn}(?:其中|包括|含|包含)?\s*{num}\s*{unit}{child}"),
-            "family": re.compile(rf"(?:一家|全家|我們是)?{num}口(?:之)?(?:家|家庭)?"),
-            "special": re.compile(r"夫妻|兩口子|夫婦|伴侶|情侶|一對|我(?:和|與|跟)(?:太太|老婆|妻子|先生|老公|丈夫)|父母|爸媽|爸爸媽媽|家長|(?:祖父母|爺爺奶奶|外公外婆)"),
-        }
+        # spaCy模型與匹配器延遲到正則解析失敗時才載入，None 表示尚未嘗試
+        self.spacy_available: bool | None = None
+        self.chinese_nums = _CN_DIGITS
+        # 解析結果只取決於查詢字串，以 LRU 快取重複查詢；快取 tuple，每次回傳新的字典
+        self._parse_cached = lru_cache(maxsize=4096)(self._parse_counts)
+
+    def _ensure_spacy(self) -> bool:
+        """首次需要時載入spaCy模型與匹配器，返回是否可用"""
+        if self.spacy_available is None:
+            try:
+                self.nlp = get_shared_spacy_model("zh_core_web_md")
+                self._init_spacy_matcher()
+                self.spacy_available = True
+                logger.info("成功載入spaCy中文模型")
+            except Exception as e:
+                self.spacy_available = False
+                logger.warning(f"無法載入spaCy模型: {e!s}，將使用正則表達式")
+        return self.spacy_available
 
     def _init_spacy_matcher(self):
         """初始化spaCy匹配器"""
+        from spacy.matcher import Matcher
+
         self.matcher = Matcher(self.nlp.vocab)
-        self.matcher.add("GUEST_COUNT", [
-            [{"LIKE_NUM": True}, {"TEXT": {"IN": ["大", "大人", "成人"]}}, {"LIKE_NUM": True}, {"TEXT": {"IN": ["小", "小孩", "兒童", "孩子"]}}],
-            [{"LIKE_NUM": True}, {"OP": "?", "TEXT": {"IN": ["個", "位", "名"]}}, {"TEXT": {"IN": ["人", "位"]}}],
+        adult, child = sorted(_ADULT_WORDS), sorted(_CHILD_WORDS)
+        unit, person = sorted(_UNIT_WORDS), sorted(_PERSON_WORDS)
+        self.matcher.add("GUEST_ADULT_CHILD", [
+            [{"LIKE_NUM": True}, {"TEXT": {"IN": adult}}, {"LIKE_NUM": True}, {"TEXT": {"IN": child}}],
+        ])
+        # 可選的量詞展開為固定長度的兩條規則，避免 OP:"?" 的組合展開
+        self.matcher.add("GUEST_TOTAL", [
+            [{"LIKE_NUM": True}, {"TEXT": {"IN": person}}],
+            [{"LIKE_NUM": True}, {"TEXT": {"IN": unit}}, {"TEXT": {"IN": person}}],
         ])
+        # 「X大Y小」詞序回退：數字詞不一定被標為 LIKE_NUM，匹配後再以數字表解析
+        self.matcher.add("GUEST_ADULT_CHILD_LOOSE", [
+            [{}, {"TEXT": "大"}, {}, {"TEXT": "小"}],
+        ])
+        # 預先取得標籤的整數ID，匹配時直接比對整數
+        self._adult_child_id = self.nlp.vocab.strings.add("GUEST_ADULT_CHILD")
+        self._loose_adult_child_id = self.nlp.vocab.strings.add("GUEST_ADULT_CHILD_LOOSE")
 
     def _parse_number(self, text: str) -> int | None:
         """解析數字，超過MAX_GUESTS返回None"""
-        num = self.chinese_nums.get(text, int(text)) if text.isdigit() or text in self.chinese_nums else None
+        # 常見寫法直接查表，其他寫法（前導零、全形數字或超出上限）才轉換判斷
+        if num := _GUEST_NUMBERS.get(text):
+            return num
+        num = int(text) if text.isdigit() else None
         return num if num and num <= self.MAX_GUESTS else None
 
     def parse(self, query: str) -> dict[str, int]:
-        """解析查詢中的人數信息"""
+        """解析查詢中的人數信息，相同查詢直接取用快取結果"""
+        adults, children = self._parse_cached(query)
+        return {"adults": adults, "children": children}
+
+    def _parse_counts(self, query: str) -> tuple[int | None, int | None]:
+        """解析查詢中的 (成人, 兒童)，結果由 _parse_cached 快取"""
         guests = self._parse_with_regex(query)
-        if guests["adults"] is not None or guests["children"] is not None:
-            return guests
-        return self._parse_with_spacy(query) if self.spacy_available else guests
+        # spaCy規則都需要「大/人/位」其中之一，缺少時直接略過，也不必載入模型
+        if (
+            guests["adults"] is None
+            and guests["children"] is None
+            and not _SPACY_HINT_CHARS.isdisjoint(query)
+            and self._ensure_spacy()
+        ):
+            guests = self._parse_with_spacy(query)
+        return guests["adults"], guests["children"]
 
     def _parse_with_regex(self, query: str) -> dict[str, int]:
         """使用正則表達式解析人數信息"""
-        guests = {"adults": None, "children": None}
-
+        # 查詢不含任何模式必備的字元時，不必進入正則引擎
+        if _GUEST_HINT_CHARS.isdisjoint(query):
+            return {"adults": None, "children": None}
+
+        # 單次掃描，記錄各類模式的第一個匹配；直接模式優先度最高，匹配到即停止掃描
+        # （若其人數無效，下方會回退為各類模式獨立搜尋）
+        found = {}
+        for match in _GUEST_RE.finditer(query):
+            found.setdefault(kind := match.lastgroup, match)
+            if kind == "direct":
+                break
+        counts = None
+        if found and not (counts := self._resolve_matches(found, strict=True)):
+            # 遇到無效匹配時，改以各類模式獨立搜尋，避免其他模式的匹配被重疊的無效匹配吃掉
+            found = {name: match for name, pattern in _GUEST_PATTERNS.items() if (match := pattern.search(query))}
+            counts = self._resolve_matches(found)
+
+        # 各模式以 (成人, 兒童) 回傳，只在最後建立一次結果字典
+        adults, children = counts or (None, None)
+        return {"adults": adults, "children": children}
+
+    def _resolve_matches(
+        self, found: dict[str, re.Match], strict: bool = False
+    ) -> tuple[int, int | None] | None:
+        """依優先順序從各類模式的匹配取出 (成人, 兒童)；無結果，或 strict 時遇到無效匹配，返回None"""
         # 直接模式
-        if match := self.patterns["direct"].search(query):
-            adults, children = self._parse_number(match.group(1)), self._parse_number(match.group(2))
+        if match := found.get("direct"):
+            adults, children = self._parse_number(match["direct_adults"]), self._parse_number(match["direct_children"])
             if adults and children:
-                guests["adults"], guests["children"] = adults, children
-                logger.debug(f"直接模式: 成人={adults}, 兒童={children}")
-                return guests
+                logger.debug("直接模式: 成人={}, 兒童={}", adults, children)
+                return adults, children
+            if strict:
+                return None
 
         # 總數模式
-        if match := self.patterns["total"].search(query):
-            total, children = self._parse_number(match.group(1)), self._parse_number(match.group(2))
+        if match := found.get("total"):
+            total, children = self._parse_number(match["total_count"]), self._parse_number(match["total_children"])
             if total and children:
                 adults = max(1, total - children)
                 if adults <= self.MAX_GUESTS:
-                    guests["adults"], guests["children"] = adults, children
-                    logger.debug(f"總數模式: 總數={total}, 成人={adults}, 兒童={children}")
-                    return guests
+                    logger.debug("總數模式: 總數={}, 成人={}, 兒童={}", total, adults, children)
+                    return adults, children
+            if strict:
+                return None
 
         # 家庭模式
-        if match := self.patterns["family"].search(query):
-            total = self._parse_number(match.group(1))
+        if match := found.get("family"):
+            total = self._parse_number(match["family_count"])
             if total:
-                guests["adults"], guests["children"] = 2, max(0, total - 2)
-                logger.debug(f"家庭模式: 總數={total}, 成人=2, 兒童={guests['children']}")
-                return guests
+                children = max(0, total - 2)
+                logger.debug("家庭模式: 總數={}, 成人=2, 兒童={}", total, children)
+                return 2, children
+            if strict:
+                return None
 
         # 特殊模式
-        if match := self.patterns["special"].search(query):
-            text = match.group(0)
-            guests["adults"] = 2
-            if "祖父母" in text or "爺爺奶奶" in text or "外公外婆" in text:
-                guests["adults"] += 2
-            logger.debug(f"特殊模式: 成人={guests['adults']}")
-            return guests
+        if match := found.get("special"):
+            adults = 4 if match["grandparents"] else 2
+            logger.debug("特殊模式: 成人={}", adults)
+            return adults, None
 
-        return guests
+        return None
 
     def _parse_with_spacy(self, query: str) -> dict[str, int]:
         """使用spaCy解析人數信息"""
-        guests = {"adults": None, "children": None}
-        doc = self.nlp(query)
-        matches = self.matcher(doc)
-
-        for _, start, end in matches:
-            span = doc[start:end]
-            nums = [self._parse_number(t.text) for t in span if t.like_num]
-            text = span.text
-            if "大" in text and len(nums) >= 2:
-                guests["adults"], guests["children"] = nums[0], nums[1]
-            elif "人" in text or "位" in text and nums:
-                total = nums[0]
-                guests["adults"] = total
-                guests["children"] = 0
-
-        if guests["adults"] is None and "大" in query and "小" in query:
-            tokens = [t.text for t in doc]
-            for i, t in enumerate(tokens):
-                if t == "大" and i > 0 and i < len(tokens) - 2 and tokens[i + 2] == "小":
-                    adults = self._parse_number(tokens[i - 1])
-                    children = self._parse_number(tokens[i + 1])
-                    if adults and children:
-                        guests["adults"], guests["children"] = adults, children
-                        break
-
-        if guests["adults"] or guests["children"]:
-            logger.debug(f"spaCy解析: 成人={guests['adults']}, 兒童={guests['children']}")
-        return guests
+        # 匹配規則只用到 LIKE_NUM/TEXT 等詞彙屬性，只需分詞，不必跑完整管線
+        return self._parse_doc(self.nlp.make_doc(query))
+
+    def _parse_doc(self, doc: Doc) -> dict[str, int]:
+        """從已分詞的 Doc 解析人數信息"""
+        from spacy.attrs import LIKE_NUM
+
+        # 以區域變數追蹤結果，最後一次寫回字典
+        adults = children = None
+        # 詞序回退只在其他規則都沒有解析出成人時採用，取第一個兩數皆有效的匹配
+        loose = None
+        # 一次取出整份文件的詞文字與 LIKE_NUM 旗標，避免逐詞存取屬性
+        tokens = [t.text for t in doc]
+        like_num = doc.to_array(LIKE_NUM).tolist()
+
+        for match_id, start, end in self.matcher(doc):
+            if match_id == self._loose_adult_child_id:
+                if loose is None and (found_adults := self._parse_number(tokens[start])):
+                    if found_children := self._parse_number(tokens[start + 2]):
+                        loose = found_adults, found_children
+                continue
+            nums = [self._parse_number(tokens[i]) for i in range(start, end) if like_num[i]]
+            if match_id == self._adult_child_id:
+                adults, children = nums[0], nums[1]
+            else:
+                adults, children = nums[0], 0
+
+        if adults is None and loose:
+            adults, children = loose
+
+        if adults or children:
+            logger.debug("spaCy解析: 成人={}, 兒童={}", adults, children)
+        return {"adults": adults, "children": children}
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理客人信息解析請求"""
-        logger.debug(f"[{self.name}] 處理請求")
+        logger.debug("[{}] 處理請求", self.name)
         query = state.get("query", "")
         try:
             guests = self.parse(query)
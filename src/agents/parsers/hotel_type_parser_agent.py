@@ -3,12 +3,59 @@
 """
 
 import re
+from collections import Counter
+from functools import lru_cache
 from typing import Any
 
 from loguru import logger
 
 from src.agents.base.base_agent import BaseAgent
 
+# 旅館類型關鍵詞映射
+_HOTEL_TYPE_KEYWORDS = {
+    "BASIC": ["基本", "標準", "一般", "普通"],
+    "HOTEL": ["飯店", "酒店", "旅館", "旅店"],
+    "RESORT": ["度假村", "度假酒店", "度假飯店", "渡假村"],
+    "HOSTEL": ["青年旅館", "青旅", "背包客棧", "背包客", "背包房"],
+    "HOMESTAY": ["民宿", "家庭旅館", "家庭式", "家庭住宿"],
+    "VILLA": ["別墅", "villa", "獨棟", "獨立屋"],
+    "APARTMENT": ["公寓", "套房", "apartment", "服務式公寓"],
+    "CAMPING": ["露營", "營地", "帳篷", "露營地", "露營區"],
+    "GLAMPING": ["豪華露營", "精緻露營", "奢華露營", "glamping"],
+    "BNB": ["B&B", "bed and breakfast", "早餐旅館"],
+    "LUXURY": ["豪華", "奢華", "高級", "五星", "五星級"],
+    "BUDGET": ["經濟", "便宜", "平價", "實惠", "預算"],
+    "BOUTIQUE": ["精品", "特色", "設計", "藝術", "boutique"],
+    "HOT_SPRING": ["溫泉", "湯屋", "泡湯", "溫泉旅館", "溫泉飯店"],
+    "SEASIDE": ["海邊", "海濱", "濱海", "海景", "海岸"],
+    "MOUNTAIN": ["山區", "山上", "山景", "高山", "森林"],
+    "CITY": ["市區", "市中心", "都市", "市內", "市區"],
+}
+# 所有類型合併為單一正則，每個類型一個具名群組，單次掃描即可依 lastgroup 計數
+# 群組內關鍵詞由長到短排列，「溫泉旅館」不會先匹配到「溫泉」而讓「旅館」另計為 HOTEL
+_HOTEL_TYPE_RE = re.compile(
+    "|".join(
+        f"(?P<{hotel_type}>{'|'.join(map(re.escape, sorted(keywords, key=len, reverse=True)))})"
+        for hotel_type, keywords in _HOTEL_TYPE_KEYWORDS.items()
+    )
+)
+# 任一關鍵詞的匹配必以其首字開頭，查詢中沒有任何首字時不必掃描
+_HOTEL_TYPE_FIRST_CHARS = frozenset(keyword[0] for keywords in _HOTEL_TYPE_KEYWORDS.values() for keyword in keywords)
+
+# LLM 解析用的系統提示固定不變，模組載入時建立一次，也利於供應端的提示快取
+_TYPE_LIST = ", ".join(_HOTEL_TYPE_KEYWORDS)
+_LLM_SYSTEM_PROMPT = f"""
+        你是一個旅館預訂系統的旅館類型解析器。
+        你的任務是從用戶的自然語言查詢中提取旅館類型。
+        請從以下類型中選擇一個最匹配的：
+        {_TYPE_LIST}
+        
+        如果查詢中沒有明確提到旅館類型，請根據上下文推斷。
+        如果無法推斷，請返回 "BASIC"。
+        
+        請直接返回類型代碼，不要添加任何其他內容。
+        """
+
 
 class HotelTypeParserAgent(BaseAgent):
     """旅館類型解析子Agent"""
@@ -16,35 +63,14 @@ class HotelTypeParserAgent(BaseAgent):
     def __init__(self):
         """初始化旅館類型解析子Agent"""
         super().__init__("HotelTypeParserAgent")
-        # 旅館類型關鍵詞映射
-        self.hotel_type_keywords = {
-            "BASIC": ["基本", "標準", "一般", "普通"],
-            "HOTEL": ["飯店", "酒店", "旅館", "旅店"],
-            "RESORT": ["度假村", "度假酒店", "度假飯店", "渡假村"],
-            "HOSTEL": ["青年旅館", "青旅", "背包客棧", "背包客", "背包房"],
-            "HOMESTAY": ["民宿", "家庭旅館", "家庭式", "家庭住宿"],
-            "VILLA": ["別墅", "villa", "獨棟", "獨立屋"],
-            "APARTMENT": ["公寓", "套房", "apartment", "服務式公寓"],
-            "CAMPING": ["露營", "營地", "帳篷", "露營地", "露營區"],
-            "GLAMPING": ["豪華露營", "精緻露營", "奢華露營", "glamping"],
-            "BNB": ["B&B", "bed and breakfast", "早餐旅館"],
-            "LUXURY": ["豪華", "奢華", "高級", "五星", "五星級"],
-            "BUDGET": ["經濟", "便宜", "平價", "實惠", "預算"],
-            "BOUTIQUE": ["精品", "特色", "設計", "藝術", "boutique"],
-            "HOT_SPRING": ["溫泉", "湯屋", "泡湯", "溫泉旅館", "溫泉飯店"],
-            "SEASIDE": ["海邊", "海濱", "濱海", "海景", "海岸"],
-            "MOUNTAIN": ["山區", "山上", "山景", "高山", "森林"],
-            "CITY": ["市區", "市中心", "都市", "市內", "市區"],
-        }
-        # 旅館類型正則表達式模式
-        self.hotel_type_patterns = {}
-        for hotel_type, keywords in self.hotel_type_keywords.items():
-            pattern = "|".join(keywords)
-            self.hotel_type_patterns[hotel_type] = re.compile(f"({pattern})")
+        # 保留實例屬性以相容既有存取方式
+        self.hotel_type_keywords = _HOTEL_TYPE_KEYWORDS
+        # 解析結果只取決於查詢字串，以 LRU 快取重複查詢
+        self._hotel_type_cached = lru_cache(maxsize=4096)(self._scan_hotel_type)
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理旅館類型解析請求"""
-        logger.debug(f"[{self.name}] 開始處理旅館類型解析請求")
+        logger.debug("[{}] 開始處理旅館類型解析請求", self.name)
 
         # 從輸入中提取查詢和上下文
         query = state.get("query", "")
@@ -79,19 +105,21 @@ class HotelTypeParserAgent(BaseAgent):
             return {"hotel_type": "BASIC", "message": f"旅館類型解析失敗，使用預設類型：BASIC（錯誤：{e!s}）"}
 
     def _extract_hotel_type_with_regex(self, query: str) -> str:
-        """使用正則表達式從查詢中提取旅館類型"""
-        # 記錄匹配到的類型及其出現次數
-        type_counts = {}
+        """使用正則表達式從查詢中提取旅館類型，相同查詢直接取用快取結果"""
+        if _HOTEL_TYPE_FIRST_CHARS.isdisjoint(query):
+            return ""
+        return self._hotel_type_cached(query)
 
-        for hotel_type, pattern in self.hotel_type_patterns.items():
-            matches = pattern.findall(query)
-            if matches:
-                type_counts[hotel_type] = len(matches)
-                logger.debug(f"從查詢中提取到旅館類型: {hotel_type}，匹配次數: {len(matches)}")
+    def _scan_hotel_type(self, query: str) -> str:
+        """掃描查詢中的旅館類型關鍵詞，結果由 _hotel_type_cached 快取"""
+        # 記錄匹配到的類型及其出現次數
+        type_counts = Counter(match.lastgroup for match in _HOTEL_TYPE_RE.finditer(query))
 
-        # 如果有匹配到類型，返回出現次數最多的類型
+        # 如果有匹配到類型，返回出現次數最多的類型，次數相同時依類型定義順序
         if type_counts:
-            max_type = max(type_counts.items(), key=lambda x: x[1])[0]
+            logger.opt(lazy=True).debug("從查詢中提取到旅館類型及匹配次數: {}", lambda: dict(type_counts))
+            # 依定義順序取 max，同分時保留先定義的類型；未出現的類型計為 0
+            max_type = max(_HOTEL_TYPE_KEYWORDS, key=type_counts.__getitem__)
             logger.info(f"從查詢中提取到最可能的旅館類型: {max_type}")
             return max_type
 
@@ -99,26 +127,11 @@ class HotelTypeParserAgent(BaseAgent):
 
     async def _extract_hotel_type_with_llm(self, query: str) -> str:
         """使用LLM從查詢中提取旅館類型"""
-        # 構建類型列表字符串
-        type_list = ", ".join(self.hotel_type_keywords.keys())
-
-        system_prompt = f"""
-        你是一個旅館預訂系統的旅館類型解析器。
-        你的任務是從用戶的自然語言查詢中提取旅館類型。
-        請從以下類型中選擇一個最匹配的：
-        {type_list}
-        
-        如果查詢中沒有明確提到旅館類型，請根據上下文推斷。
-        如果無法推斷，請返回 "BASIC"。
-        
-        請直接返回類型代碼，不要添加任何其他內容。
-        """
-
         response_format = {"type": str}
 
         # 使用共用方法提取旅館類型
         response = await self._extract_with_llm(
-            prompt=f"從以下查詢中提取旅館類型：{query}", system_prompt=system_prompt
+            prompt=f"從以下查詢中提取旅館類型：{query}", system_prompt=_LLM_SYSTEM_PROMPT
         )
 
         # 如果回應是字符串，進行處理
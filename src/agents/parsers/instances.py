@@ -3,60 +3,56 @@
 """
 
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from loguru import logger
 
+# 解析器名稱對應的（模組路徑, 類別名稱），首次存取時才導入並創建實例
+_PARSER_CLASSES = {
+    "budget_parser_agent": ("src.agents.parsers.budget_parser_agent", "BudgetParserAgent"),
+    "date_parser_agent": ("src.agents.parsers.date_parser_agent", "DateParserAgent"),
+    "food_req_parser_agent": ("src.agents.parsers.food_req_parser_agent", "FoodReqParserAgent"),
+    "geo_parser_agent": ("src.agents.parsers.geo_parser_agent", "GeoParserAgent"),
+    "guest_parser_agent": ("src.agents.parsers.guest_parser_agent", "GuestParserAgent"),
+    "hotel_type_parser_agent": ("src.agents.parsers.hotel_type_parser_agent", "HotelTypeParserAgent"),
+    "keyword_parser_agent": ("src.agents.parsers.keyword_parser_agent", "KeywordParserAgent"),
+    "special_req_parser_agent": ("src.agents.parsers.special_req_parser_agent", "SpecialReqParserAgent"),
+    "supply_parser_agent": ("src.agents.parsers.supply_parser_agent", "SupplyParserAgent"),
+}
+
 
 class LazyParserLoader:
     """延遲加載解析器的類"""
 
-    def __init__(self):
-        """初始化延遲加載器"""
-        self._instances: dict[str, Any] = {}
-        self._initialized = False
-
-    def _initialize(self):
-        """初始化所有解析器實例"""
-        if self._initialized:
+    def _create(self, name: str) -> Any:
+        """導入並創建單一解析器實例"""
+        module_path, class_name = _PARSER_CLASSES[name]
+        logger.info(f"初始化解析器實例: {name}")
+        module = importlib.import_module(module_path)
+        return getattr(module, class_name)()
+
+    def preload(self) -> None:
+        """以執行緒池並行創建所有尚未載入的解析器，首次啟動時間由各解析器載入時間的總和降為最大值"""
+        missing = [name for name in _PARSER_CLASSES if name not in vars(self)]
+        if not missing:
             return
 
-        logger.info("初始化所有解析器實例...")
-
-        # 動態導入所有解析器類
-        budget_parser_module = importlib.import_module("src.agents.parsers.budget_parser_agent")
-        date_parser_module = importlib.import_module("src.agents.parsers.date_parser_agent")
-        food_req_parser_module = importlib.import_module("src.agents.parsers.food_req_parser_agent")
-        geo_parser_module = importlib.import_module("src.agents.parsers.geo_parser_agent")
-        guest_parser_module = importlib.import_module("src.agents.parsers.guest_parser_agent")
-        hotel_type_parser_module = importlib.import_module("src.agents.parsers.hotel_type_parser_agent")
-        keyword_parser_module = importlib.import_module("src.agents.parsers.keyword_parser_agent")
-        special_req_parser_module = importlib.import_module("src.agents.parsers.special_req_parser_agent")
-        supply_parser_module = importlib.import_module("src.agents.parsers.supply_parser_agent")
-
-        # 創建所有解析器的實例
-        self._instances["budget_parser_agent"] = budget_parser_module.BudgetParserAgent()
-        self._instances["date_parser_agent"] = date_parser_module.DateParserAgent()
-        self._instances["food_req_parser_agent"] = food_req_parser_module.FoodReqParserAgent()
-        self._instances["geo_parser_agent"] = geo_parser_module.GeoParserAgent()
-        self._instances["guest_parser_agent"] = guest_parser_module.GuestParserAgent()
-        self._instances["hotel_type_parser_agent"] = hotel_type_parser_module.HotelTypeParserAgent()
-        self._instances["keyword_parser_agent"] = keyword_parser_module.KeywordParserAgent()
-        self._instances["special_req_parser_agent"] = special_req_parser_module.SpecialReqParserAgent()
-        self._instances["supply_parser_agent"] = supply_parser_module.SupplyParserAgent()
-
-        self._initialized = True
-        logger.info("所有解析器實例初始化完成")
+        # 各解析器的spaCy模型延遲到首次解析時才載入，這裡只並行模組匯入與實例創建
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            instances = list(executor.map(self._create, missing))
+        for name, instance in zip(missing, instances, strict=True):
+            setattr(self, name, instance)
 
     def __getattr__(self, name):
-        """獲取解析器實例"""
-        if not self._initialized:
-            self._initialize()
-
-        if name in self._instances:
-            return self._instances[name]
-
-        raise AttributeError(f"LazyParserLoader 沒有屬性 '{name}'")
+        """獲取解析器實例，只在首次存取時創建"""
+        if name not in _PARSER_CLASSES:
+            raise AttributeError(f"LazyParserLoader 沒有屬性 '{name}'")
+
+        # 存為實例屬性，之後由一般屬性查找直接取得，不再經過 __getattr__
+        instance = self._create(name)
+        setattr(self, name, instance)
+        return instance
 
 
 # 創建延遲加載器實例
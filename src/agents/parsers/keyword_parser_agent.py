@@ -5,10 +5,18 @@
 import re
 from typing import Any
 
+import orjson
 from loguru import logger
 
 from src.agents.base.base_agent import BaseAgent
 
+# 從LLM回應中擷取JSON物件
+_JSON_OBJECT_RE = re.compile(r"{.*}", re.DOTALL)
+
+# 關鍵字搜尋指示詞：找、查、搜尋/搜索、尋找、有沒有/有無/有什麼/有哪些、推薦、介紹、建議
+# 多字詞皆已被其中的單字涵蓋，合併為一次掃描
+_KEYWORD_INDICATOR_RE = re.compile("[找查搜尋推介薦議]|有[沒無什哪]")
+
 
 class KeywordParserAgent(BaseAgent):
     """旅館名稱/關鍵字解析子Agent"""
@@ -153,14 +161,16 @@ class KeywordParserAgent(BaseAgent):
         response = await llm_service.generate_response(messages, system_prompt)
 
         try:
-            # 使用正則表達式提取JSON
-            json_pattern = re.compile(r"{.*}", re.DOTALL)
-            match = json_pattern.search(response)
-            if match:
-                import orjson
-
+            # 回應本身即為JSON時直接解析，失敗才以正則表達式擷取JSON
+            keywords = None
+            if response.lstrip().startswith("{"):
+                try:
+                    keywords = orjson.loads(response)
+                except orjson.JSONDecodeError:
+                    pass
+            if not isinstance(keywords, dict) and (match := _JSON_OBJECT_RE.search(response)):
                 keywords = orjson.loads(match.group(0))
-
+            if isinstance(keywords, dict):
                 # 記錄LLM識別的關鍵字
                 if keywords.get("hotel_keyword"):
                     logger.info(f"LLM識別的旅館名稱: {keywords['hotel_keyword']}")
@@ -180,31 +190,4 @@ class KeywordParserAgent(BaseAgent):
             return True
 
         # 檢查是否包含特定關鍵詞
-        keyword_indicators = [
-            "找",
-            "搜尋",
-            "搜索",
-            "查詢",
-            "查找",
-            "尋找",
-            "查",
-            "搜",
-            "尋",
-            "有沒有",
-            "有無",
-            "有什麼",
-            "有哪些",
-            "有沒",
-            "有無",
-            "有什",
-            "有哪",
-            "推薦",
-            "介紹",
-            "建議",
-            "推",
-            "介",
-            "薦",
-            "議",
-        ]
-
-        return any(indicator in query for indicator in keyword_indicators)
+        return _KEYWORD_INDICATOR_RE.search(query) is not None
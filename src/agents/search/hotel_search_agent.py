@@ -4,6 +4,7 @@
 負責根據解析後的搜索條件搜索旅館。
 """
 
+import asyncio
 from typing import Any
 
 from loguru import logger
@@ -11,6 +12,24 @@ from loguru import logger
 from src.agents.base.base_agent import BaseAgent
 from src.api.services import hotel_api_service
 
+# 足以進行旅館搜索的關鍵條件
+_CRITICAL_PARAMS = ("county_ids", "district_ids", "hotel_id", "hotel_keyword")
+
+# 放寬搜索時移除的條件：價格範圍、設施要求與其他特殊要求（保留人數要求）
+_RELAXED_DROP = frozenset(
+    {
+        "lowest_price",
+        "highest_price",
+        "hotel_facility_ids",
+        "room_facility_ids",
+        "has_breakfast",
+        "has_lunch",
+        "has_dinner",
+        "room_types",
+        "bed_type",
+    }
+)
+
 
 class HotelSearchAgent(BaseAgent):
     """旅館搜索Agent"""
@@ -57,9 +76,19 @@ class HotelSearchAgent(BaseAgent):
         api_params = self._filter_api_params(params)
         logger.info(f"旅館搜索參數: {api_params}")
 
+        # 放寬條件的參數只構建一次，供關鍵字過濾與放寬搜索共用
+        relaxed_params = self._build_relaxed_search_params(params)
+
         # 嘗試使用提供的參數進行搜索
         try:
-            results = await self.api_service.search_hotels(api_params)
+            relaxed_results = None
+            if not params.get("district_ids"):
+                # 未指定鄉鎮區時條件較不確定，同時發出放寬條件的搜索以隱藏其延遲
+                results, relaxed_results = await asyncio.gather(
+                    self.api_service.search_hotels(api_params), self._perform_relaxed_search(relaxed_params)
+                )
+            else:
+                results = await self.api_service.search_hotels(api_params)
             if results:
                 # 過濾有效結果
                 filtered_results = self._filter_valid_results(results)
@@ -77,7 +106,8 @@ class HotelSearchAgent(BaseAgent):
             # 如果有關鍵字，嘗試使用關鍵字過濾
             if params.get("hotel_keyword"):
                 keyword = params["hotel_keyword"]
-                relaxed_results = await self._perform_relaxed_search(params)
+                if relaxed_results is None:
+                    relaxed_results = await self._perform_relaxed_search(relaxed_params)
                 filtered_by_keyword = self._filter_by_keyword(relaxed_results, keyword)
                 if filtered_by_keyword:
                     self._log_search_results(filtered_by_keyword)
@@ -90,22 +120,19 @@ class HotelSearchAgent(BaseAgent):
                         "llm_recommend_hotel": hotel_names[:3],  # 只取前三個
                     }
 
-            # 嘗試使用放寬條件的搜索
-            relaxed_params = self._build_relaxed_search_params(params)
-            logger.info(f"使用放寬條件進行搜索: {relaxed_params}")
-            relaxed_results = await self.api_service.search_hotels(relaxed_params)
+            # 嘗試使用放寬條件的搜索，已取得的放寬結果直接沿用
+            if relaxed_results is None:
+                relaxed_results = await self._perform_relaxed_search(relaxed_params)
             if relaxed_results:
-                filtered_relaxed_results = self._filter_valid_results(relaxed_results)
-                if filtered_relaxed_results:
-                    self._log_search_results(filtered_relaxed_results)
-                    # 提取旅館名稱並保存到 llm_recommend_hotel
-                    hotel_names = [hotel.get("name") for hotel in filtered_relaxed_results if hotel.get("name")]
-                    return {
-                        "hotel_search_results": filtered_relaxed_results,
-                        "search_type": "relaxed",
-                        "message": "找到部分符合條件的旅館(放寬條件後搜尋)",
-                        "llm_recommend_hotel": hotel_names[:3],  # 只取前三個
-                    }
+                self._log_search_results(relaxed_results)
+                # 提取旅館名稱並保存到 llm_recommend_hotel
+                hotel_names = [hotel.get("name") for hotel in relaxed_results if hotel.get("name")]
+                return {
+                    "hotel_search_results": relaxed_results,
+                    "search_type": "relaxed",
+                    "message": "找到部分符合條件的旅館(放寬條件後搜尋)",
+                    "llm_recommend_hotel": hotel_names[:3],  # 只取前三個
+                }
 
             # 所有搜索都失敗，返回空結果
             logger.warning("未找到符合條件的旅館")
@@ -119,32 +146,8 @@ class HotelSearchAgent(BaseAgent):
         """
         檢查是否有足夠的搜索條件
         """
-        # 檢查是否有任何搜索條件
-        if not params:
-            return False
-
-        # 檢查是否有關鍵搜索條件之一
-        critical_params = ["county_ids", "district_ids", "hotel_id", "hotel_keyword"]
-        has_critical_param = any(params.get(param) for param in critical_params)
-
-        # 檢查是否有充分的參數組合
-        sufficient_combinations = [
-            # 縣市 + 入住日期
-            (params.get("county_ids") and params.get("check_in")),
-            # 縣市 + 人數
-            (params.get("county_ids") and params.get("adults")),
-            # 鄉鎮區 + 入住日期
-            (params.get("district_ids") and params.get("check_in")),
-            # 鄉鎮區 + 人數
-            (params.get("district_ids") and params.get("adults")),
-            # 酒店ID
-            bool(params.get("hotel_id")),
-            # 關鍵字
-            bool(params.get("hotel_keyword")),
-        ]
-
-        # 如果任一組合成立，則認為有足夠的搜索條件
-        return has_critical_param or any(sufficient_combinations)
+        # 縣市/鄉鎮區 + 日期或人數的組合都已隱含關鍵條件，只需檢查關鍵條件之一，命中即短路返回
+        return any(params.get(param) for param in _CRITICAL_PARAMS)
 
     def _validate_required_params(self, params: dict[str, Any]) -> bool:
         """
@@ -268,33 +271,13 @@ class HotelSearchAgent(BaseAgent):
         """
         構建放寬條件的搜索參數
         """
-        # 複製原參數
-        relaxed_params = params.copy()
-
-        # 放寬條件的策略
-        # 1. 移除價格範圍限制
-        if "lowest_price" in relaxed_params:
-            del relaxed_params["lowest_price"]
-        if "highest_price" in relaxed_params:
-            del relaxed_params["highest_price"]
-
-        # 2. 移除設施要求
-        if "hotel_facility_ids" in relaxed_params:
-            del relaxed_params["hotel_facility_ids"]
-        if "room_facility_ids" in relaxed_params:
-            del relaxed_params["room_facility_ids"]
-
-        # 3. 如果有縣市但沒有鄉鎮區，保留縣市
+        # 移除價格、設施與特殊要求，保留人數要求
+        relaxed_params = {k: v for k, v in params.items() if k not in _RELAXED_DROP}
+
+        # 如果同時有縣市和鄉鎮區，只保留縣市範圍
         if relaxed_params.get("county_ids") and relaxed_params.get("district_ids"):
-            # 如果同時有縣市和鄉鎮區，只保留縣市範圍
             del relaxed_params["district_ids"]
 
-        # 4. 保留人數要求，但移除其他特殊要求
-        special_reqs = ["has_breakfast", "has_lunch", "has_dinner", "room_types", "bed_type"]
-        for req in special_reqs:
-            if req in relaxed_params:
-                del relaxed_params[req]
-
         return relaxed_params
 
     def _filter_by_keyword(self, results: list, keyword: str) -> list:
@@ -360,14 +343,10 @@ class HotelSearchAgent(BaseAgent):
 
         return valid_results
 
-    async def _perform_relaxed_search(self, params: dict[str, Any]) -> list:
+    async def _perform_relaxed_search(self, relaxed_params: dict[str, Any]) -> list:
         """
-        執行放寬條件的搜索
+        以已構建的放寬條件參數執行搜索
         """
-        # 構建放寬條件的搜索參數
-        relaxed_params = self._build_relaxed_search_params(params)
-
-        # 執行搜索
         try:
             logger.info(f"使用放寬條件進行搜索: {relaxed_params}")
             results = await self.api_service.search_hotels(relaxed_params)
@@ -4,6 +4,7 @@
 負責根據名稱模糊搜索旅館。
 """
 
+import re
 from typing import Any
 
 from loguru import logger
@@ -11,6 +12,9 @@ from loguru import logger
 from src.agents.base.base_agent import BaseAgent
 from src.api.services import hotel_api_service
 
+# 常見停用詞，模組載入時編譯一次
+_STOPWORDS_RE = re.compile("我|想|要|找|一個|一家|有|的|旅館|飯店|酒店|住宿")
+
 
 class HotelSearchFuzzyAgent(BaseAgent):
     """旅館模糊搜索子Agent"""
@@ -76,14 +80,9 @@ class HotelSearchFuzzyAgent(BaseAgent):
         # 如果沒有關鍵字，嘗試從原始查詢中提取
         if not keywords and "original_query" in context:
             # 這裡只是一個簡單的示例，實際應用中可能需要更複雜的邏輯
-            query = context["original_query"]
-            # 移除常見的停用詞
-            stop_words = ["我", "想", "要", "找", "一個", "一家", "有", "的", "旅館", "飯店", "旅館", "住宿"]
-            for word in stop_words:
-                query = query.replace(word, " ")
-
-            # 分割查詢並過濾空字符串
-            keywords = [k.strip() for k in query.split() if k.strip()]
+            # 移除常見的停用詞後分割，split() 已過濾空字串
+            query = _STOPWORDS_RE.sub(" ", context["original_query"])
+            keywords = query.split()
 
         return keywords
 
@@ -101,48 +101,48 @@ class HotelSearchPlanAgent(BaseAgent):
             parsed_data = context["parsed_data"]
 
             # 提取日期信息
-            if parsed_data.get("dates"):
-                search_params["check_in"] = parsed_data["dates"].get("check_in")
-                search_params["check_out"] = parsed_data["dates"].get("check_out")
+            if dates := parsed_data.get("dates"):
+                search_params["check_in"] = dates.get("check_in")
+                search_params["check_out"] = dates.get("check_out")
 
             # 提取人數信息
-            if parsed_data.get("guests"):
-                search_params["adults"] = parsed_data["guests"].get("adults", 2)
-                search_params["children"] = parsed_data["guests"].get("children", 0)
+            if guests := parsed_data.get("guests"):
+                search_params["adults"] = guests.get("adults", 2)
+                search_params["children"] = guests.get("children", 0)
 
             # 提取預算信息
-            if parsed_data.get("budget"):
-                search_params["lowest_price"] = parsed_data["budget"].get("min")
-                search_params["highest_price"] = parsed_data["budget"].get("max")
+            if budget := parsed_data.get("budget"):
+                search_params["lowest_price"] = budget.get("min")
+                search_params["highest_price"] = budget.get("max")
 
             # 提取地理信息
-            if parsed_data.get("geo"):
-                search_params["county_ids"] = parsed_data["geo"].get("county_ids", [])
-                search_params["district_ids"] = parsed_data["geo"].get("district_ids", [])
+            if geo := parsed_data.get("geo"):
+                search_params["county_ids"] = geo.get("county_ids", [])
+                search_params["district_ids"] = geo.get("district_ids", [])
 
             # 提取設施信息
-            if parsed_data.get("facilities"):
-                search_params["hotel_facility_ids"] = parsed_data["facilities"].get("hotel_facility_ids", [])
-                search_params["room_facility_ids"] = parsed_data["facilities"].get("room_facility_ids", [])
+            if facilities := parsed_data.get("facilities"):
+                search_params["hotel_facility_ids"] = facilities.get("hotel_facility_ids", [])
+                search_params["room_facility_ids"] = facilities.get("room_facility_ids", [])
 
             # 提取房型信息
-            if parsed_data.get("room_types"):
-                search_params["room_types"] = parsed_data["room_types"]
+            if room_types := parsed_data.get("room_types"):
+                search_params["room_types"] = room_types
 
             # 提取餐食信息
-            if parsed_data.get("food_req"):
-                search_params["has_breakfast"] = parsed_data["food_req"].get("has_breakfast", False)
-                search_params["has_lunch"] = parsed_data["food_req"].get("has_lunch", False)
-                search_params["has_dinner"] = parsed_data["food_req"].get("has_dinner", False)
+            if food_req := parsed_data.get("food_req"):
+                search_params["has_breakfast"] = food_req.get("has_breakfast", False)
+                search_params["has_lunch"] = food_req.get("has_lunch", False)
+                search_params["has_dinner"] = food_req.get("has_dinner", False)
 
             # 提取旅館類型信息
-            if parsed_data.get("hotel_type"):
-                search_params["hotel_group_types"] = parsed_data["hotel_type"]
+            if hotel_type := parsed_data.get("hotel_type"):
+                search_params["hotel_group_types"] = hotel_type
 
             # 提取關鍵字
-            if parsed_data.get("keywords"):
-                search_params["hotel_keyword"] = parsed_data["keywords"].get("hotel_keyword", "")
-                search_params["plan_keyword"] = parsed_data["keywords"].get("plan_keyword", "")
+            if keywords := parsed_data.get("keywords"):
+                search_params["hotel_keyword"] = keywords.get("hotel_keyword", "")
+                search_params["plan_keyword"] = keywords.get("plan_keyword", "")
 
         return search_params
 
@@ -164,14 +164,13 @@ class HotelSearchPlanAgent(BaseAgent):
 
     def _has_sufficient_search_conditions(self, state: dict[str, Any]) -> bool:
         """檢查是否有足夠的搜索條件"""
-        # 至少需要日期和地點
-        has_dates = state.get("check_in") and state.get("check_out")
-        has_location = bool(state.get("county_ids")) or bool(state.get("district_ids"))
-
-        # 如果有旅館關鍵字或方案關鍵字，可以進行搜索
-        has_keywords = bool(state.get("hotel_keyword")) or bool(state.get("plan_keyword"))
-
-        return (has_dates and has_location) or has_keywords
+        get = state.get
+        # 有旅館關鍵字或方案關鍵字即可搜索，否則至少需要日期和地點
+        return bool(
+            get("hotel_keyword")
+            or get("plan_keyword")
+            or (get("check_in") and get("check_out") and (get("county_ids") or get("district_ids")))
+        )
 
 
 # 創建旅館搜索計劃子Agent實例
@@ -11,6 +11,9 @@ from loguru import logger
 from src.agents.base.base_agent import BaseAgent
 from src.api.services import poi_api_service
 
+# 周邊地標查詢快取上限；熱門旅館的相同查詢會跨請求重複出現
+_NEARBY_CACHE_MAX = 256
+
 
 class POISearchAgent(BaseAgent):
     """周邊地標搜索 Agent"""
@@ -18,6 +21,8 @@ class POISearchAgent(BaseAgent):
     def __init__(self):
         """初始化周邊地標搜索 Agent"""
         super().__init__("POISearchAgent")
+        # 查詢字串 → 請求任務，進行中的相同查詢也共用同一個任務
+        self._nearby_cache: dict[str, asyncio.Task] = {}
 
     async def process(self, state: dict[str, Any]) -> dict[str, Any]:
         """處理周邊地標搜索請求"""
@@ -52,15 +57,19 @@ class POISearchAgent(BaseAgent):
             poi_results = []
             surroundings_map_images = []
 
-            # 遍歷前3個旅館，避免請求過多
-            for hotel in hotels[:3]:
-                hotel_id = hotel.get("id")
-                hotel_name = hotel.get("name", "未知旅館")
+            # 只取前3個旅館，避免請求過多
+            target_hotels = [(hotel.get("id"), hotel.get("name", "未知旅館")) for hotel in hotels[:3]]
+            logger.info(f"開始搜索旅館 {', '.join(name for _, name in target_hotels)} 周邊地標")
 
-                logger.info(f"開始搜索旅館 {hotel_name} 周邊地標")
+            # 同時為每個旅館搜索推薦的POI，結果順序與旅館順序一致
+            all_hotel_poi_results = await asyncio.gather(
+                *(
+                    self._search_pois_for_hotel(hotel_name, hotel_id, llm_recommend_hotel)
+                    for hotel_id, hotel_name in target_hotels
+                )
+            )
 
-                # 為每個旅館搜索推薦的POI
-                hotel_poi_results = await self._search_pois_for_hotel(hotel_name, hotel_id, llm_recommend_hotel)
+            for (hotel_id, hotel_name), hotel_poi_results in zip(target_hotels, all_hotel_poi_results, strict=True):
                 if hotel_poi_results:
                     poi_results.append(hotel_poi_results)
 
@@ -81,7 +90,7 @@ class POISearchAgent(BaseAgent):
             # 定義一個內部函數，搜索特定關鍵字的POI
             async def fetch_poi(keyword: str):
                 try:
-                    result = await poi_api_service.search_nearby_places(f"{hotel_name} 附近 {keyword}")
+                    result = await self._search_nearby(f"{hotel_name} 附近 {keyword}")
                     return {"keyword": keyword, "places": result.get("places", [])}
                 except Exception as e:
                     logger.error(f"搜索 {hotel_name} 附近的 {keyword} 失敗: {e}")
@@ -108,6 +117,26 @@ class POISearchAgent(BaseAgent):
             logger.error(f"搜索 {hotel_name} 周邊地標失敗: {e}")
             return None
 
+    async def _search_nearby(self, text_query: str) -> dict:
+        """查詢周邊地標，相同查詢共用快取的請求任務"""
+        cache = self._nearby_cache
+        task = cache.pop(text_query, None)
+        if task is None:
+            if len(cache) >= _NEARBY_CACHE_MAX:
+                # 移除最久未使用的項目
+                del cache[next(iter(cache))]
+            task = asyncio.create_task(poi_api_service.search_nearby_places(text_query))
+        # 重新插入以維持最近使用順序
+        cache[text_query] = task
+        try:
+            # shield 避免單一呼叫端被取消時連帶取消共用的任務
+            return await asyncio.shield(task)
+        except Exception:
+            # 失敗的請求不保留，下次重新查詢
+            if cache.get(text_query) is task:
+                del cache[text_query]
+            raise
+
 
 # 創建周邊地標搜索Agent實例
 poi_search_agent = POISearchAgent()
@@ -24,6 +24,9 @@ class GeoCache:
         self._counties: list[dict[str, Any]] = []
         self._counties_districts: list[dict[str, Any]] = []
         self._districts: list[dict[str, Any]] = []
+        # ID → 名稱索引，於初始化時建立一次，供 O(1) 查詢
+        self._county_name_by_id: dict[Any, str] = {}
+        self._district_name_by_id: dict[Any, str] = {}
         self._initialized = False
         self._lock = asyncio.Lock()
 
@@ -55,6 +58,7 @@ class GeoCache:
 
             # 嘗試從磁碟加載快取
             if await self._load_cache_from_disk():
+                self._build_id_indexes()
                 self._initialized = True
                 logger.info("從磁碟加載地理資料快取成功")
                 return
@@ -78,9 +82,17 @@ class GeoCache:
             async with aiofiles.open(self._counties_district_cache_path, "rb") as f:
                 self._counties_districts = loads(await f.read())
 
+            self._build_id_indexes()
             self._initialized = True
             logger.info("地理資料快取初始化完成")
 
+    def _build_id_indexes(self) -> None:
+        """建立縣市與鄉鎮區的 ID → 名稱索引"""
+        self._county_name_by_id = {county["id"]: county.get("name") for county in self._counties if county.get("id")}
+        self._district_name_by_id = {
+            district["id"]: district.get("name") for district in self._districts if district.get("id")
+        }
+
     async def _load_cache_from_disk(self) -> bool:
         """從磁碟加載快取資料"""
         try:
@@ -393,6 +405,8 @@ class GeoCache:
             # 清除記憶體中的資料
             self._counties = []
             self._districts = []
+            self._county_name_by_id = {}
+            self._district_name_by_id = {}
             self._county_names = []
             self._district_names = []
             self._county_index = None
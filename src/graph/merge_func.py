@@ -8,10 +8,8 @@ class MergeFunc:
 
     @staticmethod
     def dict_merge(dict1: dict[str, Any], dict2: dict[str, Any]) -> dict[str, Any]:
-        """合併兩個字典"""
-        result = dict1.copy()
-        result.update(dict2)
-        return result
+        """合併兩個字典，衝突時以第二個為準"""
+        return dict1 | dict2
 
     @staticmethod
     def merge_list_top3(list1: list[Any], list2: list[Any]) -> list[Any]:
@@ -28,7 +26,7 @@ class MergeFunc:
         if response2 is None:
             return response1
         result = copy.deepcopy(response1)
-        result.update(response2)
+        result |= response2
         return result
 
     @staticmethod
@@ -4,12 +4,11 @@
 import asyncio
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, TypedDict
+from typing import Annotated, Any, TypedDict
 
 from langgraph.graph import END, StateGraph
 from loguru import logger
 from opencc import OpenCC
-from typing_extensions import Annotated
 
 # 引入所需的 Agent
 from src.agents.generators.hotel_recommendation_agent import HotelRecommendationAgent
@@ -120,6 +119,8 @@ class HotelRecommendationWorkflow:
         """載入所有解析器"""
         from src.agents.parsers.instances import parsers
 
+        # 各解析器都會用到，先並行創建，再逐一取用
+        parsers.preload()
         self.budget_parser = parsers.budget_parser_agent
         self.date_parser = parsers.date_parser_agent
         self.geo_parser = parsers.geo_parser_agent
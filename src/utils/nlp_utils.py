@@ -2,11 +2,19 @@
 NLP 工具模組，提供共享的自然語言處理功能
 """
 
+from __future__ import annotations
+
+import asyncio
 import threading
+from typing import TYPE_CHECKING
 
-import spacy
 from loguru import logger
 
+# spaCy匯入耗時，延遲到實際載入模型時才匯入
+if TYPE_CHECKING:
+    import spacy
+    from spacy.tokens import Doc
+
 # 全局模型緩存
 _spacy_models: dict[str, spacy.Language] = {}
 _model_lock = threading.Lock()
@@ -36,6 +44,8 @@ def get_shared_spacy_model(model_name: str) -> spacy.Language:
             logger.debug(f"使用已在等待鎖過程中載入的spaCy模型: {model_name}")
             return _spacy_models[model_name]
 
+        import spacy
+
         # 載入模型
         try:
             logger.info(f"載入spaCy模型: {model_name}")
@@ -50,3 +60,111 @@ def get_shared_spacy_model(model_name: str) -> spacy.Language:
             _spacy_models[model_name] = nlp
             logger.warning(f"使用基本的spaCy功能替代模型: {model_name}")
             return nlp
+
+
+# 解析器只用到分詞、LIKE_NUM 與 NER，略過其餘元件（NER 只依賴 tok2vec）
+_ANALYZE_DISABLE = ("tagger", "parser", "attribute_ruler", "lemmatizer")
+
+
+# 批次分析設定：每批最多筆數與結果快取上限
+_BATCH_SIZE = 32
+_DOC_CACHE_MAX = 1024
+
+
+class SpacyBatcher:
+    """
+    將同一輪事件循環內送達的文本合併成一批，在執行緒中以nlp.pipe一次分析並快取結果
+
+    分析中或已快取的文本不會重複分析；回傳的Doc為共享物件，呼叫端只可讀取，不應修改
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._docs: dict[str, Doc] = {}
+        self._pending: dict[str, asyncio.Future] = {}
+        self._flush_handle: asyncio.Handle | None = None
+        # 保留執行中的分析任務，避免被垃圾回收
+        self._tasks: set[asyncio.Task] = set()
+        # 同一模型的nlp.pipe不保證執行緒安全，各批依序分析
+        self._pipe_lock = threading.Lock()
+
+    async def submit(self, text: str) -> Doc:
+        """送出文本並等待分析結果"""
+        if (doc := self._docs.pop(text, None)) is not None:
+            self._docs[text] = doc
+            return doc
+
+        if (future := self._pending.get(text)) is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[text] = loop.create_future()
+            if len(self._pending) >= _BATCH_SIZE:
+                self._flush()
+            elif self._flush_handle is None:
+                # 排在本輪已就緒的工作之後，同時送出的查詢不需額外等待即可併入同一批
+                self._flush_handle = loop.call_soon(self._flush)
+
+        # 同一文本的等待者共用future，單一等待者被取消時不影響其他人
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        """將目前累積的文本交給背景任務分析"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._analyze(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _pipe(self, texts: list[str]) -> list[Doc]:
+        """在執行緒中載入模型並分析一批文本"""
+        nlp = get_shared_spacy_model(self.model_name)
+        with self._pipe_lock:
+            return list(nlp.pipe(texts, disable=_ANALYZE_DISABLE, batch_size=_BATCH_SIZE))
+
+    async def _analyze(self, pending: dict[str, asyncio.Future]) -> None:
+        """分析一批文本，於事件循環中喚醒等待者並更新快取"""
+        try:
+            docs = await asyncio.to_thread(self._pipe, list(pending))
+        except asyncio.CancelledError:
+            for future in pending.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"spaCy批次分析失敗: {e}")
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (text, future), doc in zip(pending.items(), docs, strict=True):
+            self._docs[text] = doc
+            if not future.done():
+                future.set_result(doc)
+        while len(self._docs) > _DOC_CACHE_MAX:
+            del self._docs[next(iter(self._docs))]
+
+
+# 各模型共用的批次分析器
+_batchers: dict[str, SpacyBatcher] = {}
+
+
+async def analyze(model_name: str, text: str) -> Doc:
+    """
+    以共享模型分析文本，併入同時送達的其他查詢批次處理，同一查詢在多個解析器間只需分析一次
+
+    回傳的Doc為共享物件，呼叫端只可讀取，不應修改
+
+    Args:
+        model_name: spaCy模型名稱
+        text: 要分析的文本
+
+    Returns:
+        分析後的Doc
+    """
+    if (batcher := _batchers.get(model_name)) is None:
+        batcher = _batchers[model_name] = SpacyBatcher(model_name)
+    return await batcher.submit(text)
@@ -5,10 +5,9 @@
 """
 
 import re
-from typing import Pattern
 
 
-def extract_with_patterns(text: str, patterns: list[Pattern]) -> str | None:
+def extract_with_patterns(text: str, patterns: list[re.Pattern]) -> str | None:
     """
     使用多個正則表達式模式從文本中提取信息
 
@@ -31,7 +30,7 @@ def extract_with_patterns(text: str, patterns: list[Pattern]) -> str | None:
     return None
 
 
-def extract_all_with_patterns(text: str, patterns: list[Pattern]) -> list[str]:
+def extract_all_with_patterns(text: str, patterns: list[re.Pattern]) -> list[str]:
     """
     使用多個正則表達式模式從文本中提取所有匹配的信息
 
@@ -0,0 +1,86 @@
+"""
+測試預算解析器的正則表達式路徑
+"""
+
+import pytest
+
+from src.agents.parsers.budget_parser_agent import BudgetParserAgent, _scan_number, _unit_multiplier
+
+
+@pytest.fixture(scope="module")
+def budget_parser() -> BudgetParserAgent:
+    """建立預算解析器"""
+    return BudgetParserAgent()
+
+
+@pytest.mark.parametrize(
+    ("query", "start", "number"),
+    [
+        ("預算3000", 2, "3000"),
+        ("預算12000元", 2, "12000"),
+        ("1.5萬", 0, "1.5"),
+        ("預算1,200,000", 2, "1,200,000"),
+        # 逗號或小數點後沒有數字時不納入
+        ("3000,還有", 0, "3000"),
+        ("1.2.3", 0, "1.2"),
+    ],
+)
+def test_scan_number(query, start, number):
+    """從起始數字掃描出完整數字"""
+    assert _scan_number(query, start) == number
+
+
+@pytest.mark.parametrize(
+    ("query", "lowest", "highest"),
+    [
+        # 不含逗號的整數完整讀取，不再只取前三位
+        ("預算3000", 2400, 3600),
+        ("預算12000元", 9600, 14400),
+        ("1.5萬", 12000, 18000),
+        ("預算1,200,000", 960000, 1440000),
+        ("3000-5000元", 3000, 5000),
+        ("2000到3000", 2000, 3000),
+        ("最多8000元", 0, 8000),
+        # 日期中的數字不當作金額
+        ("2025年5月1日入住台北，預算5000元", 4000, 6000),
+        ("2025-05-01到2025-05-03 預算5000", 4000, 6000),
+        # 無效的人數數字略過，取之後的有效金額
+        ("2大1小 預算5000", 4000, 6000),
+        ("3000/晚", 2400, 3600),
+    ],
+)
+def test_parse_with_regex(budget_parser, query, lowest, highest):
+    """正則表達式解析出的預算範圍"""
+    budget = budget_parser._parse_with_regex(query, _unit_multiplier(query))
+    assert budget == {"lowest_price": lowest, "highest_price": highest}
+
+
+@pytest.mark.parametrize("query", ["預算300", "2025年5月1日入住"])
+def test_parse_with_regex_no_budget(budget_parser, query):
+    """低於最低有效金額或只有日期時不產生預算"""
+    assert budget_parser._parse_with_regex(query, _unit_multiplier(query)) == {}
+
+
+@pytest.mark.parametrize(
+    ("query", "budget"),
+    [
+        ("預算5000", {"lowest_price": 4000, "highest_price": 6000}),
+        # 範圍不成立時，同起點的數字視為單一金額
+        ("3000到1000元", {"lowest_price": 2400, "highest_price": 3600}),
+        ("2025年5月1日", {}),
+        ("2025-05-01 預算", {}),
+    ],
+)
+def test_parse_with_fallback(budget_parser, query, budget):
+    """後備規則解析出的預算範圍"""
+    assert budget_parser._parse_with_fallback(query, 1) == budget
+
+
+@pytest.mark.asyncio
+async def test_process_without_money_unit_skips_spacy():
+    """查詢沒有金額單位時，正則解析不需載入spaCy"""
+    budget_parser = BudgetParserAgent()
+    result = await budget_parser.process({"query": "2大1小 預算5000"})
+
+    assert result == {"lowest_price": 4000, "highest_price": 6000}
+    assert budget_parser.spacy_available is None
@@ -0,0 +1,43 @@
+"""
+測試日期解析器的正則表達式路徑
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.agents.parsers.date_parser_agent import DateParserAgent
+
+# 固定的「現在」，MM-DD與中文日期皆以此年份補上
+NOW = datetime(2026, 10, 17, 15, 30)
+
+
+@pytest.fixture(scope="module")
+def date_parser() -> DateParserAgent:
+    """建立日期解析器"""
+    return DateParserAgent()
+
+
+@pytest.mark.parametrize(
+    ("query", "check_in", "check_out"),
+    [
+        # MM-DD與中文日期彼此重疊時，兩者都要保留
+        ("1-12月24日", "2026-01-12", "2026-12-24"),
+        ("6-12月5號", "2026-06-12", "2026-12-05"),
+        # 年月日中的「12-1」不可再被當成MM-DD
+        ("2012-1-2", "2012-01-02", "2012-01-03"),
+        ("2026/11/05 到 2026/11/07", "2026-11-05", "2026-11-07"),
+        ("11-05到11-08", "2026-11-05", "2026-11-08"),
+        ("12月1號-12月3號", "2026-12-01", "2026-12-03"),
+        ("5月15日入住一晚", "2026-05-15", "2026-05-16"),
+    ],
+)
+def test_extract_dates_with_regex(date_parser, query, check_in, check_out):
+    """正則表達式解析出的入住與退房日期"""
+    dates = date_parser._extract_dates_with_regex(query, NOW)
+    assert dates == {"check_in": check_in, "check_out": check_out}
+
+
+def test_extract_dates_with_regex_invalid_date(date_parser):
+    """無效日期不列入結果"""
+    assert date_parser._extract_dates_with_regex("2月30日", NOW) == {"check_in": None, "check_out": None}
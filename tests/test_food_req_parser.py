@@ -0,0 +1,33 @@
+"""
+測試餐食需求解析器的正則表達式路徑
+"""
+
+import pytest
+
+from src.agents.parsers.food_req_parser_agent import FoodReqParserAgent
+
+
+@pytest.fixture(scope="module")
+def food_req_parser() -> FoodReqParserAgent:
+    """建立餐食需求解析器"""
+    return FoodReqParserAgent()
+
+
+@pytest.mark.parametrize(
+    ("query", "breakfast", "lunch", "dinner"),
+    [
+        ("要早餐", True, False, False),
+        ("含早餐和晚餐", True, False, True),
+        # 否定詞優先於其中包含的肯定關鍵字
+        ("不要早餐", False, False, False),
+        ("不含晚餐但要早餐", True, False, False),
+        ("沒有特別需求", False, False, False),
+    ],
+)
+def test_extract_food_req_with_regex(food_req_parser, query, breakfast, lunch, dinner):
+    """正則表達式解析出的餐食需求"""
+    assert food_req_parser._extract_food_req_with_regex(query) == {
+        "has_breakfast": breakfast,
+        "has_lunch": lunch,
+        "has_dinner": dinner,
+    }
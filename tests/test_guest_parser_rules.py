@@ -0,0 +1,53 @@
+"""
+測試人數解析器的spaCy匹配規則
+"""
+
+import pytest
+
+from src.agents.parsers.guest_parser_agent import GuestParserAgent
+
+spacy = pytest.importorskip("spacy")
+Doc = pytest.importorskip("spacy.tokens").Doc
+
+
+@pytest.fixture(scope="module")
+def guest_parser() -> GuestParserAgent:
+    """建立以空白中文管線建立匹配器的人數解析器，不需下載模型"""
+    parser = GuestParserAgent()
+    parser.nlp = spacy.blank("zh")
+    parser._init_spacy_matcher()
+    parser.spacy_available = True
+    return parser
+
+
+@pytest.mark.parametrize(
+    ("words", "adults", "children"),
+    [
+        # 「成人」與「大」同屬成人詞，依成人/兒童規則解析
+        (["2", "成人", "1", "小"], 2, 1),
+        (["2", "大", "1", "小"], 2, 1),
+        (["3", "個", "人"], 3, 0),
+    ],
+)
+def test_parse_doc(guest_parser, words, adults, children):
+    """以固定分詞結果驗證匹配規則解析出的成人與兒童人數"""
+    doc = Doc(guest_parser.nlp.vocab, words=words)
+    assert guest_parser._parse_doc(doc) == {"adults": adults, "children": children}
+
+
+@pytest.mark.parametrize(
+    ("words", "adults", "children"),
+    [
+        # 「兩」不被標為 LIKE_NUM，只有「X大Y小」詞序規則能匹配
+        (["兩", "大", "一", "小"], 2, 1),
+        # 取第一個兩數皆有效的詞序匹配
+        (["很", "大", "的", "小", "兩", "大", "兩", "小"], 2, 2),
+        # 其他規則已解析出成人時不採用詞序規則
+        (["3", "個", "人", "兩", "大", "一", "小"], 3, 0),
+        (["很", "大", "的", "小"], None, None),
+    ],
+)
+def test_parse_doc_loose_adult_child(guest_parser, words, adults, children):
+    """「X大Y小」詞序回退規則"""
+    doc = Doc(guest_parser.nlp.vocab, words=words)
+    assert guest_parser._parse_doc(doc) == {"adults": adults, "children": children}
@@ -0,0 +1,36 @@
+"""
+測試旅館類型解析器的正則表達式路徑
+"""
+
+import pytest
+
+from src.agents.parsers.hotel_type_parser_agent import HotelTypeParserAgent
+
+
+@pytest.fixture(scope="module")
+def hotel_type_parser() -> HotelTypeParserAgent:
+    """建立旅館類型解析器"""
+    return HotelTypeParserAgent()
+
+
+@pytest.mark.parametrize(
+    ("query", "hotel_type"),
+    [
+        ("飯店", "HOTEL"),
+        ("露營", "CAMPING"),
+        ("想住民宿", "HOMESTAY"),
+        # 複合關鍵字只計入本身的類型，不再與其包含的通用類型同分
+        ("青年旅館", "HOSTEL"),
+        ("豪華露營", "GLAMPING"),
+        ("家庭旅館", "HOMESTAY"),
+        ("度假酒店", "RESORT"),
+        # 同類型中以較短關鍵詞開頭的複合關鍵詞
+        ("溫泉旅館", "HOT_SPRING"),
+        ("溫泉飯店", "HOT_SPRING"),
+        ("露營地", "CAMPING"),
+        ("隨便", ""),
+    ],
+)
+def test_extract_hotel_type_with_regex(hotel_type_parser, query, hotel_type):
+    """正則表達式解析出的旅館類型"""
+    assert hotel_type_parser._extract_hotel_type_with_regex(query) == hotel_type
@@ -0,0 +1,97 @@
+"""
+測試spaCy批次分析器
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils import nlp_utils
+from src.utils.nlp_utils import SpacyBatcher
+
+
+class FakeNLP:
+    """記錄每批送入文本的假模型，以大寫字串代替Doc"""
+
+    def __init__(self, error: Exception | None = None):
+        self.batches: list[list[str]] = []
+        self.error = error
+
+    def pipe(self, texts, disable=(), batch_size=None):
+        texts = list(texts)
+        self.batches.append(texts)
+        if self.error:
+            raise self.error
+        return [text.upper() for text in texts]
+
+
+@pytest.fixture
+def fake_nlp(monkeypatch) -> FakeNLP:
+    """以假模型取代共享模型"""
+    nlp = FakeNLP()
+    monkeypatch.setattr(nlp_utils, "get_shared_spacy_model", lambda model_name: nlp)
+    return nlp
+
+
+@pytest.mark.asyncio
+async def test_submit_batches_and_dedups(fake_nlp):
+    """同時送出的文本併成一批，重複文本只分析一次"""
+    batcher = SpacyBatcher("fake")
+    docs = await asyncio.gather(*(batcher.submit(text) for text in ["a", "b", "a", "c"]))
+
+    assert docs == ["A", "B", "A", "C"]
+    assert fake_nlp.batches == [["a", "b", "c"]]
+
+
+@pytest.mark.asyncio
+async def test_submit_uses_cache(fake_nlp):
+    """已分析的文本直接取用快取"""
+    batcher = SpacyBatcher("fake")
+    assert await batcher.submit("a") == "A"
+    assert await batcher.submit("a") == "A"
+
+    assert fake_nlp.batches == [["a"]]
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used(fake_nlp, monkeypatch):
+    """快取超過上限時淘汰最久未使用的文本"""
+    monkeypatch.setattr(nlp_utils, "_DOC_CACHE_MAX", 2)
+    batcher = SpacyBatcher("fake")
+    for text in ["a", "b"]:
+        await batcher.submit(text)
+    await batcher.submit("a")  # 命中快取，a 變為最近使用
+    await batcher.submit("c")  # 淘汰 b
+
+    await batcher.submit("a")
+    await batcher.submit("b")
+
+    assert fake_nlp.batches == [["a"], ["b"], ["c"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_failure_propagates_to_all_waiters(fake_nlp):
+    """分析失敗時，同一批的等待者都收到例外，且結果不寫入快取"""
+    fake_nlp.error = RuntimeError("boom")
+    batcher = SpacyBatcher("fake")
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    fake_nlp.error = None
+    assert await batcher.submit("a") == "A"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_affect_others(fake_nlp):
+    """單一等待者被取消時，等待同一文本的其他人仍取得結果"""
+    batcher = SpacyBatcher("fake")
+    first = asyncio.create_task(batcher.submit("a"))
+    second = asyncio.create_task(batcher.submit("a"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "A"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert fake_nlp.batches == [["a"]]